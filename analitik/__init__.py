@@ -0,0 +1,5 @@
+"""Modul pendukung Dashboard Evaluasi Penjualan.
+
+Berisi fungsi-fungsi perhitungan yang dipakai oleh ``tugas_akhir.py``
+tanpa bergantung pada Streamlit.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from analitik.batch import main
+
+sys.exit(main())
@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analitik import disk_cache, loader, timeseries, validation
+
+# Penyimpanan agregat per pelanggan per bulan (sheet) dalam file SQLite.
+# Setiap sheet disimpan dengan sidik isinya (loader.sheet_fingerprints), jadi sheet bulan
+# lalu yang diunggah ulang di workbook baru tidak diparsing ulang dari Excel. Hanya
+# sheet yang belum pernah dilihat yang dibaca dan diringkas. Selain partial per pelanggan,
+# deret harian setiap sheet (timeseries.daily_frame) juga disimpan untuk grafik tren,
+# begitu juga ringkasan laporan validasinya (validation.ValidationReport.to_dict).
+
+# Naikkan jika struktur tabel atau cara menghitung partial berubah
+STORE_VERSION = 3
+
+# Kolom partial per pelanggan per bulan
+PARTIAL_COLUMNS = ["ID Customer", "Nama", "Jumlah Transaksi", "Transaksi Terdaftar", "Total Penjualan",
+                   "Tanggal Terakhir", "Terdaftar di form", "Reseller", "Urutan"]
+_DB_COLUMNS = ["id_customer", "nama", "transaksi", "transaksi_terdaftar", "penjualan",
+               "tanggal_terakhir", "terdaftar", "reseller", "urutan"]
+
+
+def db_path():
+    # CACHE_DIR dibaca saat dipakai agar bisa diganti (mis. oleh benchmark)
+    return Path(os.environ.get("DASHBOARD_AGGREGATE_DB", disk_cache.CACHE_DIR / "agregat.sqlite"))
+
+
+def _connect():
+    path = db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    if con.execute("PRAGMA user_version").fetchone()[0] != STORE_VERSION:
+        with con:
+            con.execute("DROP TABLE IF EXISTS partial")
+            con.execute("DROP TABLE IF EXISTS bulan")
+            con.execute("DROP TABLE IF EXISTS harian")
+            con.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    # Kolom ID dan nama tanpa tipe agar angka tetap angka dan teks tetap teks
+    con.execute("""CREATE TABLE IF NOT EXISTS bulan (
+        fingerprint TEXT PRIMARY KEY, sheet TEXT, baris INTEGER, kolom TEXT, dibuat REAL, validasi TEXT)""")
+    con.execute("""CREATE TABLE IF NOT EXISTS partial (
+        fingerprint TEXT, id_customer, nama, transaksi INTEGER, transaksi_terdaftar INTEGER,
+        penjualan, tanggal_terakhir INTEGER, terdaftar INTEGER, reseller INTEGER, urutan INTEGER)""")
+    con.execute("CREATE INDEX IF NOT EXISTS partial_fingerprint ON partial (fingerprint)")
+    con.execute("""CREATE TABLE IF NOT EXISTS harian (
+        fingerprint TEXT, tanggal INTEGER, penjualan, transaksi INTEGER)""")
+    con.execute("CREATE INDEX IF NOT EXISTS harian_fingerprint ON harian (fingerprint)")
+    return con
+
+
+def _sql_value(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+# Fungsi untuk meringkas satu sheet menjadi satu baris per pelanggan:
+# jumlah transaksi (semua dan yang terdaftar), total penjualan, tanggal terakhir,
+# nama/status pertama, dan urutan kemunculan pertama di sheet.
+def month_partials(df):
+    if "ID Customer" not in df.columns:
+        return pd.DataFrame(columns=PARTIAL_COLUMNS)
+    grouped = df.assign(Urutan=np.arange(len(df))).groupby("ID Customer", sort=True, observed=True)
+    partial = grouped[["Urutan"]].min()
+    partial["Jumlah Transaksi"] = grouped.size()
+    if "Terdaftar di form" in df.columns:
+        partial["Transaksi Terdaftar"] = (df["Terdaftar di form"] == 1).groupby(
+            df["ID Customer"], sort=True, observed=True).sum()
+    else:
+        partial["Transaksi Terdaftar"] = 0
+    partial["Total Penjualan"] = grouped["Total Penjualan"].sum() if "Total Penjualan" in df.columns else 0
+    if "Tanggal" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Tanggal"]):
+        partial["Tanggal Terakhir"] = grouped["Tanggal"].max()
+    else:
+        partial["Tanggal Terakhir"] = pd.NaT
+    for col in ["Nama", "Terdaftar di form", "Reseller"]:
+        partial[col] = grouped[col].first() if col in df.columns else None
+    return partial.reset_index()[PARTIAL_COLUMNS]
+
+
+def _insert(con, fingerprint, sheet, df, partial, daily, report):
+    tanggal = partial["Tanggal Terakhir"]
+    tanggal = np.where(tanggal.isna(), None, tanggal.to_numpy(dtype="datetime64[ns]").astype(np.int64))
+    columns = [partial[col].astype(object) for col in PARTIAL_COLUMNS if col != "Tanggal Terakhir"]
+    rows = zip(*columns[:5], tanggal, *columns[5:])
+    with con:
+        con.execute("DELETE FROM partial WHERE fingerprint = ?", (fingerprint,))
+        con.executemany(f"INSERT INTO partial (fingerprint, {', '.join(_DB_COLUMNS)}) VALUES ({', '.join('?' * 10)})",
+                        ((fingerprint, *map(_sql_value, row)) for row in rows))
+        con.execute("DELETE FROM harian WHERE fingerprint = ?", (fingerprint,))
+        con.executemany("INSERT INTO harian VALUES (?, ?, ?, ?)",
+                        ((fingerprint, int(day.value), _sql_value(penjualan), int(transaksi))
+                         for day, penjualan, transaksi in daily[timeseries.DAILY_COLUMNS].itertuples()))
+        con.execute("INSERT OR REPLACE INTO bulan VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint, sheet, len(df), json.dumps([str(c) for c in df.columns]), time.time(),
+                     json.dumps(report.to_dict(), default=str)))
+
+
+def _categorical(values):
+    categorical = pd.Categorical(values)
+    try:
+        return categorical.reorder_categories(sorted(categorical.categories))  # sama seperti skema saat dimuat
+    except TypeError:
+        return categorical
+
+
+def _fingerprints(source):
+    # Nama sheet ikut menjadi kunci karena dipakai sebagai label bulan
+    return {sheet: f"{fp}:{sheet}" for sheet, fp in loader.sheet_fingerprints(source).items()}
+
+
+# Membaca dan menyimpan sheet yang belum ada di penyimpanan.
+# Mengembalikan {sheet: (sumber, baris, detik)} untuk sheet yang baru dibaca.
+def _store_missing(con, source, sheet_names, fingerprints, parse_dates=None):
+    known = {fp for fp, in con.execute("SELECT fingerprint FROM bulan")}
+    missing = [sheet for sheet in sheet_names if fingerprints[sheet] not in known]
+    timings = {}
+    if missing:
+        # Sheet diparsing (paralel) tanpa digabung: setiap sheet diringkas dari frame-nya sendiri
+        # dengan tipe datanya sendiri, jadi satu sheet yang tanggalnya tidak valid tidak membuat
+        # kolom Tanggal sheet lain ikut menjadi teks, dan tidak ada salinan gabungan di memori
+        frames, waktu = loader.parse_sheets(source, missing, parse_dates=parse_dates)
+        for sheet in missing:
+            start = time.perf_counter()
+            df = frames[sheet]
+            report = loader.validation_report(source, sheet, parse_dates)  # sudah dibuat saat sheet diparsing
+            _insert(con, fingerprints[sheet], sheet, df, month_partials(df), timeseries.daily_frame(df), report)
+            sumber, detik = waktu[sheet]
+            timings[sheet] = (sumber, len(df), detik + time.perf_counter() - start)
+    return timings
+
+
+# Fungsi untuk mengambil partial semua sheet yang dipilih. Sheet yang belum ada di
+# penyimpanan dibaca dari Excel (lewat loader) lalu diringkas dan disimpan.
+# Mengembalikan (partial gabungan dengan kolom Bulan, tabel waktu muat per sheet).
+# Kolom yang tersedia di semua sheet bisa diperiksa lewat load_validation.
+def load_partials(source, sheet_names, parse_dates=None):
+    fingerprints = _fingerprints(source)
+    with _connect() as con:
+        timings = _store_missing(con, source, sheet_names, fingerprints, parse_dates)
+
+        start = time.perf_counter()
+        wanted = [fingerprints[sheet] for sheet in sheet_names]
+        placeholders = ", ".join("?" * len(wanted))
+        meta = {fp: baris for fp, baris in con.execute(
+            f"SELECT fingerprint, baris FROM bulan WHERE fingerprint IN ({placeholders})", wanted)}
+        stored = pd.read_sql_query(
+            f"SELECT fingerprint, {', '.join(_DB_COLUMNS)} FROM partial WHERE fingerprint IN ({placeholders})",
+            con, params=wanted, dtype={"tanggal_terakhir": "Int64"})
+    con.close()
+
+    stored.columns = ["fingerprint"] + PARTIAL_COLUMNS
+    # Urutan baris mengikuti urutan sheet yang dipilih, lalu urutan kemunculan di sheet
+    position = {fp: i for i, fp in enumerate(wanted)}
+    stored["_posisi"] = stored["fingerprint"].map(position)
+    stored = stored.sort_values(["_posisi", "Urutan"], kind="stable").reset_index(drop=True)
+    categories = sorted(sheet_names)
+    codes = np.array([categories.index(sheet) for sheet in sheet_names], dtype=np.int32)
+    partials = stored.drop(columns=["fingerprint", "_posisi"])
+    partials["Bulan"] = pd.Categorical.from_codes(codes[stored["_posisi"].to_numpy()], categories=categories)
+    partials["Tanggal Terakhir"] = pd.to_datetime(partials["Tanggal Terakhir"], unit="ns")
+    partials["ID Customer"] = _categorical(partials["ID Customer"])
+    partials["Nama"] = _categorical(partials["Nama"])
+
+    seconds = (time.perf_counter() - start) / max(1, len(sheet_names))
+    waktu = pd.DataFrame(
+        [(sheet, *timings.get(sheet, ("agregat", meta[fingerprints[sheet]], 0))) for sheet in sheet_names],
+        columns=["Sheet", "Sumber", "Baris", "Detik"])
+    waktu["Detik"] = (waktu["Detik"] + seconds).round(3)
+    return partials, waktu
+
+
+# Fungsi untuk mengambil deret harian gabungan sheet yang dipilih (tanggal yang sama
+# di beberapa sheet dijumlahkan). Sheet yang belum tersimpan dibaca seperti load_partials.
+def load_daily(source, sheet_names):
+    fingerprints = _fingerprints(source)
+    wanted = [fingerprints[sheet] for sheet in sheet_names]
+    with _connect() as con:
+        _store_missing(con, source, sheet_names, fingerprints)
+        stored = pd.read_sql_query(
+            f"SELECT tanggal, penjualan, transaksi FROM harian WHERE fingerprint IN ({', '.join('?' * len(wanted))})",
+            con, params=wanted)
+    con.close()
+    stored.columns = ["Tanggal"] + timeseries.DAILY_COLUMNS
+    stored["Tanggal"] = pd.to_datetime(stored["Tanggal"], unit="ns")
+    return timeseries.combine([stored.set_index("Tanggal")])
+
+
+# Fungsi untuk mengambil laporan validasi gabungan sheet yang dipilih (validation.combine).
+# Laporan per sheet dibuat sekali saat sheet disimpan, jadi file yang bermasalah tidak
+# diperiksa ulang. Posisi baris tidak disimpan, hanya jumlah dan contoh nomor barisnya,
+# jadi daftar lengkap baris yang bermasalah hanya bisa ditampilkan dari frame sheet-nya.
+def load_validation(source, sheet_names):
+    fingerprints = _fingerprints(source)
+    wanted = [fingerprints[sheet] for sheet in sheet_names]
+    with _connect() as con:
+        _store_missing(con, source, sheet_names, fingerprints)
+        stored = dict(con.execute(
+            f"SELECT fingerprint, validasi FROM bulan WHERE fingerprint IN ({', '.join('?' * len(wanted))})", wanted))
+    con.close()
+    return validation.combine({sheet: validation.ValidationReport.from_dict(json.loads(stored[fingerprints[sheet]]))
+                               for sheet in sheet_names})
+
+
+# Fungsi untuk menghapus penyimpanan agregat (semua bulan)
+def clear():
+    path = db_path()
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def info():
+    path = db_path()
+    if not path.exists():
+        return {"bulan": 0, "baris_partial": 0, "bytes": 0, "path": str(path)}
+    with _connect() as con:
+        bulan = con.execute("SELECT COUNT(*) FROM bulan").fetchone()[0]
+        partial = con.execute("SELECT COUNT(*) FROM partial").fetchone()[0]
+    con.close()
+    return {"bulan": bulan, "baris_partial": partial, "bytes": path.stat().st_size, "path": str(path)}
@@ -0,0 +1,176 @@
+"""Mode batch: memproses satu folder workbook penjualan tanpa Streamlit.
+
+Contoh:
+    python -m analitik data/ --output laporan/ --member data_member.xlsx --workers 4
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from analitik import frequency, loader, members, pareto, rfm, sales, validation
+
+
+def _to_json(value):
+    if hasattr(value, "item"):  # skalar numpy
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_chart(path, kind, data, **params):
+    from analitik import charts  # matplotlib hanya dimuat jika grafik dibuat
+
+    path.write_bytes(charts.render(kind, data, **params))
+
+
+# Fungsi untuk analisis satu sheet: informasi dasar, analisis lanjutan, CV, dan Pareto
+# Analisis yang kolomnya tidak tersedia menurut laporan validasi dilewati dan dicatat.
+def process_sheet(df, out_dir, with_charts=True, threshold=80, top_n=30, laporan=None):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    laporan = validation.validate(df) if laporan is None else laporan
+    info = sales.basic_info(df)
+    info["describe"].to_csv(out_dir / "statistik_deskriptif.csv")
+    (out_dir / "struktur_data.txt").write_text(info["info"], encoding="utf-8")
+    daily = sales.daily_totals(df)
+    daily.to_csv(out_dir / "penjualan_harian.csv", index=False)
+
+    metrics = sales.advanced_metrics(df)
+    tabel_cv = sales.cv_table(df)
+    tabel_cv.to_csv(out_dir / "koefisien_variasi.csv", index=False)
+    metrics["cv"] = {row.Kolom: {"cv": None if pd.isna(row.CV) else row.CV, "penilaian": row.Penilaian}
+                     for row in tabel_cv[tabel_cv["Jendela"] == "Per transaksi"].itertuples()}
+
+    if with_charts:
+        _write_chart(out_dir / "penjualan_harian.png", "daily", daily)
+    if not laporan.usable("pareto"):
+        metrics["pareto"] = {"dilewati": laporan.missing("pareto")}
+        return metrics
+    hasil = pareto.pareto(df, threshold=threshold, top_n=top_n)
+    hasil.top_customers.to_csv(out_dir / "pareto_top_customer.csv", index=False)
+    metrics["pareto"] = {
+        "threshold": threshold,
+        "total_penjualan": hasil.total_penjualan,
+        "jumlah_customer": hasil.jumlah_customer,
+        "jumlah_customer_top": hasil.jumlah_customer_top,
+        "penjualan_top": hasil.penjualan_top,
+        "persentase_transaksi_top": hasil.jumlah_customer_top / hasil.jumlah_transaksi * 100 if hasil.jumlah_transaksi else 0,
+    }
+    if with_charts:
+        _write_chart(out_dir / "pareto.png", "pareto", hasil.chart_data, threshold=threshold, top_n=top_n)
+    return metrics
+
+
+# Fungsi untuk menambahkan analisis yang dilewati ke tabel masalah validasi (satu baris per kolom)
+def _skipped_issues(issues, dilewati):
+    rows = [{"Sheet": sheet, "Kolom": col, "Masalah": f"Analisis {analisis} dilewati", "Tingkat": "error",
+             "Jumlah Baris": 0, "Contoh Baris Excel": ""} for sheet, analisis, kolom in dilewati for col in kolom]
+    if not rows:
+        return issues
+    return pd.concat([issues, pd.DataFrame(rows, columns=issues.columns)], ignore_index=True)
+
+
+# Fungsi untuk analisis gabungan semua sheet: frekuensi per bulan, RFM, dan member tidak bertransaksi
+def process_workbook(path, output, member=None, snapshot=None, with_charts=True, threshold=80, top_n=30):
+    start = time.perf_counter()
+    path = Path(path)
+    out_dir = Path(output) / path.stem
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sheet_names = loader.sheet_names(path)
+    report = {"file": str(path), "sheet": {}}
+
+    # Di dalam proses batch, sheet dibaca berurutan (paralelisme ada di level workbook)
+    sales_data, waktu_muat = loader.load_sheets(path, sheet_names, max_workers=1)
+    laporan = {sheet: loader.validation_report(path, sheet) for sheet in sheet_names}  # dibuat saat parsing
+    gabungan = validation.combine(laporan)
+    dilewati = []  # (sheet, analisis, kolom yang tidak tersedia), ikut ditulis ke validasi.csv
+    report["validasi"] = {"masalah": len(gabungan.issues), "kolom_tidak_valid": gabungan.unusable}
+    for sheet in sheet_names:
+        df = loader.load_sheet(path, sheet)  # tipe data per sheet, bukan hasil penyamaan antar sheet
+        report["sheet"][sheet] = process_sheet(df, out_dir / sheet, with_charts, threshold, top_n, laporan[sheet])
+        if not laporan[sheet].usable("pareto"):
+            dilewati.append((sheet, "pareto", laporan[sheet].missing("pareto")))
+
+    if gabungan.usable("frekuensi"):
+        df_kuartil, hasil_kategori = frequency.categorize_frequency(frequency.transactions_per_month(sales_data))
+        df_kuartil.to_csv(out_dir / "kuartil_per_bulan.csv", index=False)
+        hasil_kategori.to_csv(out_dir / "kategori_frekuensi.csv", index=False)
+        if with_charts:
+            _write_chart(out_dir / "kategori_frekuensi.png", "frequency", frequency.category_counts(hasil_kategori))
+    else:
+        report["frekuensi"] = {"dilewati": gabungan.missing("frekuensi")}
+        dilewati.append(("(semua)", "frekuensi", gabungan.missing("frekuensi")))
+
+    if gabungan.usable("rfm"):
+        snapshot_date = pd.Timestamp(snapshot) if snapshot else sales_data["Tanggal"].max().normalize()
+        hasil_rfm = rfm.rfm_analysis(sales_data, snapshot_date)
+        hasil_rfm.to_csv(out_dir / "rfm.csv")
+        kategori_counts = hasil_rfm["Kategori"].value_counts()
+        report["rfm"] = {"snapshot": snapshot_date, "kategori": kategori_counts.to_dict()}
+        if with_charts:
+            _write_chart(out_dir / "rfm.png", "pie", kategori_counts[kategori_counts > 0],
+                         title="Distribusi Pelanggan Berdasarkan Kategori RFM")
+    else:
+        report["rfm"] = {"dilewati": gabungan.missing("rfm")}
+        dilewati.append(("(semua)", "rfm", gabungan.missing("rfm")))
+
+    laporan_member = loader.validation_report(member, loader.sheet_names(member)[0]) if member else None
+    if member and not (laporan_member.usable("member") and gabungan.usable("frekuensi")):
+        kurang = gabungan.missing("frekuensi") + laporan_member.missing("member")
+        report["member_tidak_bertransaksi"] = {"dilewati": kurang}
+        dilewati.append(("(semua)", "member tidak bertransaksi", kurang))
+    elif member:
+        pelanggan_data = members.normalize_members(loader.load_sheet(member, loader.sheet_names(member)[0]))
+        indeks_member = members.member_index(pelanggan_data)
+        _, no_transactions = members.non_transacting(sales_data, pelanggan_data, indeks_member)
+        no_transactions.to_csv(out_dir / "member_tidak_bertransaksi.csv", index=False)
+        report["member_tidak_bertransaksi"] = len(no_transactions)
+        report["customer"] = members.customer_totals(sales_data["ID Customer"], indeks_member)
+
+    _skipped_issues(gabungan.issues, dilewati).to_csv(out_dir / "validasi.csv", index=False)
+    report["waktu_muat"] = waktu_muat.to_dict(orient="records")
+    report["detik"] = time.perf_counter() - start
+    with open(out_dir / "ringkasan.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=_to_json, ensure_ascii=False)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analitik", description="Laporan batch Dashboard Evaluasi Penjualan")
+    parser.add_argument("input", help="folder berisi file .xlsx data penjualan (atau satu file .xlsx)")
+    parser.add_argument("--output", "-o", default="laporan", help="folder hasil (default: laporan)")
+    parser.add_argument("--member", help="file .xlsx data member (sheet pertama dipakai)")
+    parser.add_argument("--snapshot", help="tanggal snapshot RFM, mis. 2024-12-31 (default: tanggal transaksi terakhir)")
+    parser.add_argument("--workers", "-j", type=int, default=loader.MAX_WORKERS, help="jumlah proses paralel")
+    parser.add_argument("--threshold", type=float, default=80, help="batas Pareto dalam persen (default: 80)")
+    parser.add_argument("--top-n", type=int, default=30, help="jumlah customer di grafik Pareto (default: 30)")
+    parser.add_argument("--no-charts", action="store_true", help="tidak membuat gambar grafik")
+    args = parser.parse_args(argv)
+
+    source = Path(args.input)
+    files = sorted(source.glob("*.xlsx")) if source.is_dir() else [source]
+    files = [f for f in files if not f.name.startswith("~$")]  # file kunci Excel
+    if args.member:
+        files = [f for f in files if f.resolve() != Path(args.member).resolve()]
+    if not files:
+        parser.error(f"tidak ada file .xlsx di {source}")
+
+    options = dict(output=args.output, member=args.member, snapshot=args.snapshot, with_charts=not args.no_charts,
+                   threshold=args.threshold, top_n=args.top_n)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(files)))) as pool:
+        futures = {pool.submit(process_workbook, path, **options): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                report = future.result()
+            except Exception as exc:  # satu file rusak tidak menghentikan file lain
+                failed += 1
+                print(f"GAGAL  {path.name}: {exc}")
+            else:
+                print(f"OK     {path.name} ({len(report['sheet'])} sheet, {report['detik']:.1f} detik)")
+    return 1 if failed else 0
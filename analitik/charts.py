@@ -0,0 +1,244 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib
+import matplotlib.dates as mdates
+import matplotlib.ticker as ticker
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+# Batas ukuran cache gambar (byte) dan jumlah maksimum label tanggal di sumbu X
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+MAX_DATE_TICKS = 31
+
+_lock = threading.Lock()
+_image_cache = OrderedDict()  # kunci hash -> bytes gambar
+_cache_bytes = 0
+
+
+def _format_ribuan(x, _):
+    return f'{int(x):,}'
+
+
+# Grafik batang total penjualan per tanggal. Jika rentang tanggal panjang,
+# label sumbu X dijarangkan agar tidak bertumpuk.
+def daily_sales_figure(df_grouped):
+    fig = Figure(figsize=(15, 7.5))
+    ax = fig.subplots()
+    ax.bar(df_grouped["Tanggal"], df_grouped["Total Penjualan"], color="royalblue", align="center")
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(_format_ribuan))
+    step = max(1, -(-len(df_grouped) // MAX_DATE_TICKS))  # pembulatan ke atas
+    ax.set_xticks(df_grouped["Tanggal"].iloc[::step])
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha("right")
+    ax.set_xlabel("Tanggal")
+    ax.set_ylabel("Total Penjualan")
+    ax.set_title("Distribusi Total Penjualan per Tanggal")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    return fig
+
+
+# Grafik batang satu tampilan deret waktu (timeseries.SalesSeries.view): satu batang per
+# periode, ditambah garis rata-rata bergerak jika ada. Label periode dijarangkan seperti
+# grafik harian agar tetap terbaca untuk rentang yang panjang.
+def series_figure(view, title=None):
+    value, *average = view.columns[1:]
+    fig = Figure(figsize=(15, 7.5))
+    ax = fig.subplots()
+    x = np.arange(len(view))
+    ax.bar(x, view[value], color="royalblue", align="center", label=value)
+    for col in average:
+        ax.plot(x, view[col], color="orange", linewidth=2, label=col)
+    if average:
+        ax.legend()
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(_format_ribuan))
+    step = max(1, -(-len(view) // MAX_DATE_TICKS))
+    ax.set_xticks(x[::step], view["Periode"].iloc[::step].astype(str))
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha("right")
+    ax.set_xlabel("Periode")
+    ax.set_ylabel(value)
+    ax.set_title(title or f"Distribusi {value}")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    return fig
+
+
+# Grafik Pareto: batang penjualan dan garis persentase kumulatif untuk N customer teratas
+def pareto_figure(chart_data, threshold=80, top_n=30):
+    with matplotlib.rc_context({'font.size': 7}):
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        id_customer = chart_data['ID Customer'].astype(str)
+        ax.margins(x=0.06)  # Beri ruang di sumbu X
+        ax.bar(id_customer, chart_data['Total Penjualan'],
+               color=np.where(chart_data[f"Above {threshold:g}%"], "lightcoral", "skyblue"))
+        ax.tick_params(axis="x", labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_ha("right")
+        ax.yaxis.set_major_formatter(ticker.FuncFormatter(_format_ribuan))
+        ax2 = ax.twinx()
+        ax2.plot(id_customer, chart_data['Cumulative Percentage'], color='orange', marker='o', linestyle='-')
+        ax2.axhline(threshold, color='red', linestyle='--', linewidth=1)
+        ax2.text(1, threshold + 2, f"{threshold:g}% Threshold", color="red", fontsize=10, ha="left")
+        ax.set_xlim(-1, top_n)
+        ax.set_title(f"Pareto Analysis : Customers Contributing to {threshold:g}% of Sales")
+        ax.set_xlabel("ID Customer")
+        ax.set_ylabel("Total Penjualan")
+        ax2.set_ylabel("Cumulative Percentage (%)")
+    return fig
+
+
+# Grafik batang bertumpuk jumlah pelanggan per kategori frekuensi tiap bulan
+def frequency_figure(kategori_df):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    kategori_df.plot(kind='bar', stacked=True, color=['#4CAF50', '#FFC107', '#F44336'], ax=ax)  # hijau, kuning, merah
+    # Menambahkan label angka di tengah batang
+    for p in ax.patches:
+        if p.get_height() > 0:
+            ax.annotate(str(int(p.get_height())), (p.get_x() + p.get_width() / 2, p.get_y() + p.get_height() / 2),
+                        ha='center', va='center', fontsize=10, color='black')
+    ax.set_title("Jumlah Pelanggan Berdasarkan Kategori Frekuensi Transaksi Tiap Bulan", fontsize=14, fontweight='bold')
+    ax.set_xlabel("Bulan")
+    ax.set_ylabel("Jumlah Pelanggan")
+    ax.legend(title="Kategori")
+    fig.tight_layout()
+    return fig
+
+
+# Diagram lingkaran dari Series jumlah per kategori
+def pie_figure(counts, title, colors=None):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.pie(counts, labels=counts.index, autopct='%1.1f%%', startangle=140,
+           colors=colors or matplotlib.colormaps["Set3"].colors,  # Warna pastel
+           textprops={'fontsize': 12}, wedgeprops={'edgecolor': 'black'})
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.axis('equal')  # Menjaga proporsi lingkaran
+    return fig
+
+
+FIGURES = {
+    "daily": daily_sales_figure,
+    "series": series_figure,
+    "pareto": pareto_figure,
+    "frequency": frequency_figure,
+    "pie": pie_figure,
+}
+
+
+# Fungsi untuk membuat kunci cache dari data agregat dan parameter grafik
+def data_key(kind, data, **params):
+    h = hashlib.sha256(kind.encode("utf-8"))
+    h.update(repr(sorted(params.items())).encode("utf-8"))
+    if isinstance(data, pd.DataFrame):
+        h.update(repr((list(data.columns), [str(d) for d in data.dtypes])).encode("utf-8"))
+    else:
+        h.update(repr((data.name, str(data.dtype))).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# Fungsi untuk menggambar grafik sekali lalu menyimpan hasilnya (PNG/SVG) di cache.
+# Figure dibuat tanpa pyplot dan langsung dibersihkan setelah disimpan.
+def render(kind, data, fmt="png", **params):
+    global _cache_bytes
+    key = (data_key(kind, data, **params), fmt)
+    with _lock:
+        if key in _image_cache:
+            _image_cache.move_to_end(key)
+            return _image_cache[key]
+
+    fig = FIGURES[kind](data, **params)
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, bbox_inches="tight")
+    finally:
+        fig.clear()
+    image = buffer.getvalue()
+
+    with _lock:
+        if key not in _image_cache:
+            _image_cache[key] = image
+            _cache_bytes += len(image)
+            while len(_image_cache) > 1 and _cache_bytes > MAX_CACHE_BYTES:
+                _, old = _image_cache.popitem(last=False)
+                _cache_bytes -= len(old)
+    return image
+
+
+# Spesifikasi Vega-Lite untuk backend grafik interaktif (tanpa matplotlib)
+def vega_spec(kind, data, threshold=80, top_n=30, title=None, colors=None):
+    if kind == "series":
+        value, *average = data.columns[1:]
+        chart_data = data.assign(Periode=data["Periode"].astype(str))
+        x = {"field": "Periode", "type": "ordinal", "sort": None}
+        layers = [{"mark": {"type": "bar", "color": "royalblue"},
+                   "encoding": {"x": x, "y": {"field": value, "type": "quantitative"},
+                                "tooltip": [{"field": "Periode"}, {"field": value, "format": ","}]}}]
+        for col in average:
+            layers.append({"mark": {"type": "line", "color": "orange"},
+                           "encoding": {"x": x, "y": {"field": col, "type": "quantitative"}}})
+        return chart_data, {"title": title or f"Distribusi {value}", "layer": layers}
+    if kind == "pareto":
+        chart_data = data.assign(**{"ID Customer": data["ID Customer"].astype(str)})
+        x = {"field": "ID Customer", "type": "nominal", "sort": None}
+        return chart_data, {
+            "title": f"Pareto Analysis : Customers Contributing to {threshold:g}% of Sales",
+            "layer": [
+                {"mark": "bar", "encoding": {
+                    "x": x, "y": {"field": "Total Penjualan", "type": "quantitative"},
+                    "color": {"field": f"Above {threshold:g}%", "type": "nominal",
+                              "scale": {"domain": [True, False], "range": ["lightcoral", "skyblue"]}}}},
+                # garis kumulatif dan batas threshold memakai sumbu Y yang sama (0-100%)
+                {"encoding": {"y": {"type": "quantitative", "scale": {"domain": [0, 100]},
+                                    "title": "Cumulative Percentage (%)"}},
+                 "layer": [
+                     {"mark": {"type": "line", "color": "orange", "point": True},
+                      "encoding": {"x": x, "y": {"field": "Cumulative Percentage"}}},
+                     {"mark": {"type": "rule", "color": "red", "strokeDash": [4, 4]},
+                      "encoding": {"y": {"datum": threshold}}},
+                 ]},
+            ],
+            "resolve": {"scale": {"y": "independent"}}}
+    if kind == "frequency":
+        long_df = data.reset_index().melt(id_vars="Bulan", var_name="Kategori", value_name="Jumlah Pelanggan")
+        long_df["Bulan"] = long_df["Bulan"].astype(str)
+        return long_df, {
+            "title": "Jumlah Pelanggan Berdasarkan Kategori Frekuensi Transaksi Tiap Bulan",
+            "mark": "bar",
+            "encoding": {"x": {"field": "Bulan", "type": "nominal"},
+                         "y": {"field": "Jumlah Pelanggan", "type": "quantitative", "stack": True},
+                         "color": {"field": "Kategori", "type": "nominal",
+                                   "sort": ["Sering", "Biasa", "Jarang"],
+                                   "scale": {"domain": ["Sering", "Biasa", "Jarang"],
+                                             "range": ["#4CAF50", "#FFC107", "#F44336"]}}}}
+    if kind == "pie":
+        pie_df = pd.DataFrame({"Kategori": data.index.astype(str), "Jumlah": data.to_numpy()})
+        color = {"field": "Kategori", "type": "nominal"}
+        if colors:
+            color["scale"] = {"domain": list(pie_df["Kategori"]), "range": list(colors)}
+        return pie_df, {
+            "title": title,
+            "mark": {"type": "arc", "stroke": "black"},
+            "encoding": {"theta": {"field": "Jumlah", "type": "quantitative"}, "color": color,
+                         "tooltip": [{"field": "Kategori"}, {"field": "Jumlah"}]}}
+    raise ValueError(f"Jenis grafik tidak dikenal: {kind}")
+
+
+def clear_cache():
+    global _cache_bytes
+    with _lock:
+        _image_cache.clear()
+        _cache_bytes = 0
+
+
+def cache_info():
+    with _lock:
+        return {"entries": len(_image_cache), "bytes": _cache_bytes, "max_bytes": MAX_CACHE_BYTES}
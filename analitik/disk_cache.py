@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import importlib.util
+
+# Lokasi dan batas ukuran cache disk. Bisa diatur lewat environment variable.
+CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", Path.home() / ".cache" / "dashboard-penjualan"))
+MAX_DISK_BYTES = int(os.environ.get("DASHBOARD_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# Naikkan jika format/skema data yang disimpan berubah, agar cache lama tidak terpakai
+CACHE_VERSION = 2
+
+_lock = threading.Lock()
+
+
+def enabled():
+    # pyarrow opsional, tanpa pyarrow cache disk dimatikan
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+# pyarrow baru diimpor saat cache benar-benar dipakai agar impor modul tetap ringan
+def _arrow():
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    return pa, feather
+
+
+def _entry_path(file_key, sheet_key):
+    name = hashlib.sha1(repr((CACHE_VERSION, sheet_key)).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{file_key}-{name}.feather"
+
+
+def _names_path(file_key):
+    return CACHE_DIR / f"{file_key}.sheets.json"
+
+
+# Fungsi untuk membaca sheet dari cache Feather (memory-mapped).
+# Mengembalikan None jika belum ada di cache.
+def load(file_key, sheet_key):
+    if not enabled():
+        return None
+    pa, feather = _arrow()
+    path = _entry_path(file_key, sheet_key)
+    try:
+        table = feather.read_table(path, memory_map=True)
+        os.utime(path)  # tandai baru dipakai untuk LRU
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas()
+
+
+# Fungsi untuk menyimpan sheet ke cache Feather (tanpa kompresi agar bisa di-mmap)
+def store(file_key, sheet_key, df):
+    if not enabled():
+        return False
+    pa, feather = _arrow()
+    path = _entry_path(file_key, sheet_key)
+    tmp = path.with_suffix(f".tmp{os.getpid()}-{threading.get_ident()}")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Kolom dengan tipe campuran tidak bisa dikonversi ke Arrow, sheet tersebut tidak di-cache
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        tmp.unlink(missing_ok=True)
+        return False
+    evict()
+    return True
+
+
+def load_sheet_names(file_key):
+    if not enabled():
+        return None
+    try:
+        with open(_names_path(file_key), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_sheet_names(file_key, names):
+    if not enabled():
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_names_path(file_key), "w", encoding="utf-8") as f:
+            json.dump(list(names), f)
+    except OSError:
+        pass
+
+
+def _entries():
+    if not CACHE_DIR.is_dir():
+        return []
+    entries = []
+    for path in [*CACHE_DIR.glob("*.feather"), *CACHE_DIR.glob("*.sheets.json")]:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+# Fungsi untuk membuang file cache paling lama dipakai jika melebihi batas ukuran
+def evict(max_bytes=None):
+    limit = MAX_DISK_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        entries = sorted(_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# Fungsi untuk menghapus cache: satu sheet, satu file, atau seluruhnya
+def invalidate(file_key=None, sheet_key=None):
+    if not CACHE_DIR.is_dir():
+        return 0
+    if file_key is None:
+        paths = list(CACHE_DIR.glob("*.feather")) + list(CACHE_DIR.glob("*.sheets.json"))
+    elif sheet_key is None:
+        paths = list(CACHE_DIR.glob(f"{file_key}-*.feather")) + [_names_path(file_key)]
+    else:
+        paths = [_entry_path(file_key, sheet_key)]
+    removed = 0
+    for path in paths:
+        if path.exists():
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def cache_info():
+    entries = _entries()
+    return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": MAX_DISK_BYTES, "dir": str(CACHE_DIR), "enabled": enabled()}
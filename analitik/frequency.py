@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+# Urutan tetap kategori frekuensi transaksi
+KATEGORI_DTYPE = pd.CategoricalDtype(['Sering', 'Biasa', 'Jarang'], ordered=True)
+
+
+# Fungsi untuk menghitung jumlah transaksi setiap pelanggan per bulan
+def transactions_per_month(sales_data):
+    return sales_data.groupby(["Bulan", "ID Customer"], observed=True).size().reset_index(name="Jumlah Transaksi")
+
+
+# Versi transactions_per_month dari partial per pelanggan per bulan (aggregate_store)
+def transactions_from_partials(partials):
+    return (partials[["Bulan", "ID Customer", "Jumlah Transaksi"]]
+            .sort_values(["Bulan", "ID Customer"], kind="stable").reset_index(drop=True))
+
+
+# Fungsi untuk mengkategorikan frekuensi transaksi berdasarkan kuartil per bulan:
+# Jarang (<= Q1), Biasa (Q1 < x <= Q3), Sering (> Q3).
+# Q1 & Q3 seluruh bulan dihitung sekaligus lalu disebarkan ke setiap baris.
+def categorize_frequency(transactions_per_month):
+    bulan_codes, bulan = pd.factorize(transactions_per_month['Bulan'], sort=True)
+    jumlah = transactions_per_month['Jumlah Transaksi']
+    kuartil = jumlah.groupby(bulan_codes).quantile([0.25, 0.75]).unstack()
+    q1 = kuartil[0.25].to_numpy()
+    q3 = kuartil[0.75].to_numpy()
+    df_kuartil = pd.DataFrame({'Bulan': np.asarray(bulan), 'Q1': q1, 'Q3': q3})
+
+    x = jumlah.to_numpy()
+    # kode kategori mengikuti KATEGORI_DTYPE: 0 = Sering, 1 = Biasa, 2 = Jarang
+    codes = np.select([x <= q1[bulan_codes], x <= q3[bulan_codes]], [2, 1], 0).astype(np.int8)
+    hasil_kategori_per_pelanggan = transactions_per_month.assign(
+        Kategori=pd.Categorical.from_codes(codes, dtype=KATEGORI_DTYPE))
+    hasil_kategori_per_pelanggan = hasil_kategori_per_pelanggan.sort_values(by=['Bulan', 'Kategori'], kind='stable')
+    return df_kuartil, hasil_kategori_per_pelanggan
+
+
+# Fungsi untuk menghitung jumlah pelanggan per kategori tiap bulan (untuk grafik)
+def category_counts(hasil_kategori_per_pelanggan):
+    return (hasil_kategori_per_pelanggan.groupby(['Bulan', 'Kategori'], observed=True).size()
+            .unstack(fill_value=0).reindex(columns=['Sering', 'Biasa', 'Jarang'], fill_value=0))  # urutan kategorinya
@@ -0,0 +1,314 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from analitik import disk_cache, shared_cache, validation
+from analitik.schema import apply_schema
+
+# Workbook di bawah ukuran ini dibaca berurutan; membuat process pool lebih mahal
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_lock = threading.Lock()
+_sheet_names_cache = OrderedDict()  # hash file -> daftar nama sheet
+_fingerprint_cache = OrderedDict()  # hash file -> {nama sheet: sidik isi sheet}
+_upload_keys = OrderedDict()  # file_id upload Streamlit -> hash file
+
+
+# Fungsi untuk membaca isi file (UploadedFile Streamlit, bytes, atau path)
+def read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+# Fungsi untuk membuat kunci cache dari isi file. Upload Streamlit punya file_id yang
+# tetap selama file-nya sama, jadi hash-nya cukup dihitung sekali per upload.
+def file_hash(source):
+    file_id = getattr(source, "file_id", None)
+    if file_id is not None:
+        with _lock:
+            if file_id in _upload_keys:
+                _upload_keys.move_to_end(file_id)
+                return _upload_keys[file_id]
+    key = hashlib.sha256(read_bytes(source)).hexdigest()
+    if file_id is not None:
+        with _lock:
+            _upload_keys[file_id] = key
+            while len(_upload_keys) > 64:
+                _upload_keys.popitem(last=False)
+    return key
+
+
+# Fungsi untuk mengambil daftar sheet tanpa membuka workbook berulang kali
+def sheet_names(source):
+    key = file_hash(source)
+    with _lock:
+        if key in _sheet_names_cache:
+            _sheet_names_cache.move_to_end(key)
+            return list(_sheet_names_cache[key])
+    names = disk_cache.load_sheet_names(key)
+    if names is None:
+        with pd.ExcelFile(BytesIO(read_bytes(source))) as xls:
+            names = list(xls.sheet_names)
+        disk_cache.store_sheet_names(key, names)
+    with _lock:
+        _sheet_names_cache[key] = names
+        while len(_sheet_names_cache) > 64:
+            _sheet_names_cache.popitem(last=False)
+    return list(names)
+
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_SHARED_STRING_RE = re.compile(rb'<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>(\d+)<')
+_STYLE_RE = re.compile(rb'<(?:\w+:)?c\b[^>]*\bs="(\d+)"')
+
+
+def _xlsx_fingerprints(data):
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+        names = set(zf.namelist())
+
+        shared = []
+        if "xl/sharedStrings.xml" in names:
+            shared = ["".join(t.text or "" for t in si.iter(f"{_NS_MAIN}t"))
+                      for si in ElementTree.fromstring(zf.read("xl/sharedStrings.xml"))]
+        formats = []  # kode format angka per indeks style (menentukan sel tanggal atau angka)
+        if "xl/styles.xml" in names:
+            styles = ElementTree.fromstring(zf.read("xl/styles.xml"))
+            custom = {fmt.get("numFmtId"): fmt.get("formatCode") for fmt in styles.iter(f"{_NS_MAIN}numFmt")}
+            cell_xfs = styles.find(f"{_NS_MAIN}cellXfs")
+            for xf in (cell_xfs if cell_xfs is not None else []):
+                formats.append(custom.get(xf.get("numFmtId"), xf.get("numFmtId")))
+
+        result = {}
+        for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+            target = targets[sheet.get(f"{_NS_REL}id")]
+            xml = zf.read(target.lstrip("/") if target.startswith("/") else "xl/" + target)
+            h = hashlib.sha256(xml)
+            # string bersama dan format yang dirujuk sheet ikut dihitung, tabel lengkapnya tidak
+            # (tabel tersebut bertambah setiap kali sheet baru ditambahkan ke workbook)
+            for i in sorted({int(i) for i in _SHARED_STRING_RE.findall(xml)}):
+                h.update(f"\0s{i}\0{shared[i]}".encode("utf-8"))
+            for i in sorted({int(i) for i in _STYLE_RE.findall(xml)}):
+                h.update(f"\0f{i}\0{formats[i] if i < len(formats) else ''}".encode("utf-8"))
+            result[sheet.get("name")] = h.hexdigest()
+    return result
+
+
+# Fungsi untuk membuat sidik isi setiap sheet tanpa memparsing datanya. Sheet yang
+# isinya sama mendapat sidik yang sama walaupun workbook-nya berbeda (mis. file bulan
+# berikutnya yang berisi sheet bulan-bulan sebelumnya), sehingga hasil olahan per sheet
+# bisa dipakai ulang. Jika struktur file tidak dikenali, sidik dibuat dari hash file.
+def sheet_fingerprints(source):
+    key = file_hash(source)
+    with _lock:
+        if key in _fingerprint_cache:
+            _fingerprint_cache.move_to_end(key)
+            return dict(_fingerprint_cache[key])
+    try:
+        result = _xlsx_fingerprints(read_bytes(source))
+    except (zipfile.BadZipFile, KeyError, IndexError, ElementTree.ParseError):
+        result = {name: hashlib.sha256(f"{key}:{name}".encode("utf-8")).hexdigest() for name in sheet_names(source)}
+    with _lock:
+        _fingerprint_cache[key] = result
+        while len(_fingerprint_cache) > 64:
+            _fingerprint_cache.popitem(last=False)
+    return dict(result)
+
+
+# Sheet yang sudah diparsing disimpan di cache bersama (shared_cache) dengan kunci
+# ("sheet", hash file, nama sheet, opsi), jadi semua sesi yang mengunggah file yang
+# sama memakai DataFrame yang sama dan ikut dihitung dalam satu batas memori.
+def _lookup(file_key, sheet_key):
+    key = ("sheet", file_key) + sheet_key
+    df = shared_cache.get(key)
+    if df is not None:
+        return df, "memori"
+    df = disk_cache.load(file_key, sheet_key)
+    if df is not None:
+        return _remember(key, df), "disk"
+    return None, None
+
+
+def _remember(key, df):
+    return shared_cache.put(key, df)
+
+
+# Fungsi untuk membaca satu sheet sekali saja per isi file.
+# DataFrame yang dikembalikan dipakai bersama oleh semua fungsi analisis,
+# jadi jangan diubah langsung (gunakan .assign / .astype / .copy()).
+# Urutan pencarian: cache memori -> cache Feather di disk -> file Excel.
+def load_sheet(source, sheet_name, parse_dates=None):
+    file_key = file_hash(source)
+    sheet_key = (sheet_name, tuple(parse_dates or ()))
+    df, _ = _lookup(file_key, sheet_key)
+    if df is None:
+        df = apply_schema(pd.read_excel(BytesIO(read_bytes(source)), sheet_name=sheet_name, parse_dates=parse_dates))
+        shared_cache.put(("validasi", file_key) + sheet_key, validation.validate(df))
+        disk_cache.store(file_key, sheet_key, df)
+        df = _remember(("sheet", file_key) + sheet_key, df)
+    return df
+
+
+# Fungsi untuk mengambil laporan validasi sheet (validation.ValidationReport). Laporan
+# dibuat saat sheet diparsing dan disimpan di cache bersama per isi file; sheet yang
+# dimuat dari cache Feather divalidasi sekali saat laporannya pertama kali diminta.
+def validation_report(source, sheet_name, parse_dates=None):
+    key = ("validasi", file_hash(source), sheet_name, tuple(parse_dates or ()))
+    return shared_cache.get_or_compute(key, lambda: validation.validate(load_sheet(source, sheet_name, parse_dates)))
+
+
+# Isi workbook untuk proses pekerja (dikirim sekali lewat initializer)
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+# Konteks proses pekerja. fork tidak dipakai: server Streamlit berjalan dengan banyak thread
+# yang memegang lock, dan proses hasil fork bisa macet jika sebuah lock sedang dipegang saat
+# fork. forkserver (atau spawn jika tidak tersedia) memulai pekerja dari proses bersih yang
+# hanya mengimpor modul ini, bukan skrip Streamlit.
+def _mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["analitik.loader"])  # pandas & openpyxl diimpor sekali di server
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+# Membaca satu sheet, menerapkan skema, dan memvalidasinya selagi datanya baru dibaca
+def _parse_sheet(sheet_name, parse_dates, data=None):
+    start = time.perf_counter()
+    df = pd.read_excel(BytesIO(_worker_data if data is None else data), sheet_name=sheet_name, parse_dates=parse_dates)
+    df = apply_schema(df)
+    return df, validation.validate(df), time.perf_counter() - start
+
+
+# Fungsi untuk menyamakan tipe data kolom antar sheet sebelum digabung
+# (angka ke tipe bersama, kategori ke gabungan semua kategorinya)
+def _harmonize_dtypes(frames):
+    columns = {}
+    for df in frames:
+        for col, dtype in df.dtypes.items():
+            columns.setdefault(col, []).append(dtype)
+    target = {}
+    for col, dtypes in columns.items():
+        if len(set(dtypes)) <= 1:
+            continue
+        if all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            categories = pd.api.types.union_categoricals(
+                [pd.Categorical([], dtype=d) for d in dtypes], ignore_order=True).categories
+            try:
+                categories = categories.sort_values()  # urutan sama seperti kategori per sheet
+            except TypeError:
+                pass
+            target[col] = pd.CategoricalDtype(categories)
+        elif all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+            target[col] = np.result_type(*dtypes)
+    if not target:
+        return frames
+    return [df.astype({col: dtype for col, dtype in target.items() if col in df.columns}) for df in frames]
+
+
+# Fungsi untuk membaca beberapa sheet tanpa menggabungkannya. Sheet yang belum ada di
+# cache diparsing paralel memakai process pool (openpyxl memakai CPU dan menahan GIL);
+# workbook kecil dibaca berurutan saja. Setiap sheet disimpan di cache seperti load_sheet.
+# Mengembalikan ({sheet: DataFrame}, {sheet: (sumber, detik)}).
+def parse_sheets(source, sheet_names, parse_dates=None, max_workers=None):
+    file_key = file_hash(source)
+    parse_dates = list(parse_dates) if parse_dates else None
+
+    def sheet_key(sheet):
+        return (sheet, tuple(parse_dates or ()))
+
+    frames, timings = {}, {}
+    missing = []
+    for sheet in sheet_names:
+        start = time.perf_counter()
+        df, sumber = _lookup(file_key, sheet_key(sheet))
+        if df is None:
+            missing.append(sheet)
+        else:
+            frames[sheet] = df
+            timings[sheet] = (sumber, time.perf_counter() - start)
+
+    workers = min(len(missing), max_workers or MAX_WORKERS)
+    data = read_bytes(source) if missing else b""
+    parsed = {}
+    if workers > 1 and len(data) >= PARALLEL_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                     initializer=_init_worker, initargs=(data,)) as pool:
+                futures = {sheet: pool.submit(_parse_sheet, sheet, parse_dates) for sheet in missing}
+                parsed = {sheet: future.result() for sheet, future in futures.items()}
+            mode = "excel (paralel)"
+        except (OSError, BrokenProcessPool):
+            workers = 1  # pool gagal dibuat, baca berurutan saja
+    if workers <= 1 or len(data) < PARALLEL_MIN_BYTES:
+        parsed = {sheet: _parse_sheet(sheet, parse_dates, data) for sheet in missing}
+        mode = "excel"
+    for sheet, (df, report, seconds) in parsed.items():
+        shared_cache.put(("validasi", file_key) + sheet_key(sheet), report)
+        disk_cache.store(file_key, sheet_key(sheet), df)
+        frames[sheet] = _remember(("sheet", file_key) + sheet_key(sheet), df)
+        timings[sheet] = (mode, seconds)
+    return frames, timings
+
+
+# Fungsi untuk membaca beberapa sheet sekaligus (lihat parse_sheets) dan menggabungkannya
+# dengan kolom "Bulan". Mengembalikan (DataFrame gabungan, tabel waktu muat per sheet).
+def load_sheets(source, sheet_names, parse_dates=None, max_workers=None):
+    frames, timings = parse_sheets(source, sheet_names, parse_dates, max_workers)
+    combined = combine_sheets(frames, sheet_names)
+    waktu = pd.DataFrame(
+        [(sheet, timings[sheet][0], len(frames[sheet]), round(timings[sheet][1], 3)) for sheet in sheet_names],
+        columns=["Sheet", "Sumber", "Baris", "Detik"])
+    return combined, waktu
+
+
+# Fungsi untuk menggabungkan frame per sheet ({sheet: DataFrame}) dengan kolom "Bulan",
+# setelah tipe data kolomnya disamakan antar sheet
+def combine_sheets(frames, sheet_names):
+    ordered = _harmonize_dtypes([frames[sheet] for sheet in sheet_names])
+    lengths = [len(df) for df in ordered]
+    # Kolom Bulan dibuat langsung dari kode kategori (tanpa menyalin string per baris);
+    # kategorinya diurutkan seperti string agar urutan groupby/sort tetap sama
+    categories = sorted(sheet_names)
+    codes = np.repeat(np.array([categories.index(sheet) for sheet in sheet_names], dtype=np.int32), lengths)
+    combined = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
+    combined["Bulan"] = pd.Categorical.from_codes(codes, categories=categories)
+    return combined
+
+
+# Fungsi untuk mengosongkan cache memori; disk=True juga menghapus cache Feather
+def clear_cache(disk=False):
+    shared_cache.clear("sheet")
+    with _lock:
+        _sheet_names_cache.clear()
+        _fingerprint_cache.clear()
+        _upload_keys.clear()
+    if disk:
+        disk_cache.invalidate()
+
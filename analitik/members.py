@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_lock = threading.Lock()
+_index_cache = OrderedDict()  # hash isi kolom ID member -> MemberIndex
+
+
+# Fungsi untuk menyamakan nama kolom ID pada data member dengan data penjualan
+def normalize_members(pelanggan_data):
+    return pelanggan_data.rename(columns={"id customer": "ID Customer"})
+
+
+# Indeks hash ID member: setiap ID unik mendapat kode 0..n-1. Kolom kategori cukup
+# dipetakan per kategori lalu disebarkan lewat kode kategorinya, jadi setiap
+# pencarian O(n) tanpa membuat ulang tabel hash per baris.
+class MemberIndex:
+    def __init__(self, member_ids):
+        member_ids = pd.Series(member_ids)
+        if isinstance(member_ids.dtype, pd.CategoricalDtype):
+            codes = member_ids.cat.codes.to_numpy()
+            unique = member_ids.cat.categories.take(pd.unique(codes[codes >= 0]))
+        else:
+            unique = pd.Index(member_ids.dropna().unique())
+        self.ids = pd.Index(unique)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Kode member untuk setiap nilai ID, -1 jika bukan member
+    def codes(self, values):
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            per_category = self.ids.get_indexer(values.cat.categories)
+            codes = values.cat.codes.to_numpy()
+            return np.where(codes >= 0, per_category[codes], -1)
+        return self.ids.get_indexer(values)
+
+    def contains(self, values):
+        return self.codes(values) >= 0
+
+    # Penanda per member (urut sesuai kode): True jika ID-nya muncul di `values`
+    # (hanya baris dengan mask True jika mask diberikan)
+    def present(self, values, mask=None):
+        codes = self.codes(values)
+        valid = codes >= 0 if mask is None else (codes >= 0) & np.asarray(mask, dtype=bool)
+        hit = np.zeros(len(self.ids), dtype=bool)
+        hit[codes[valid]] = True
+        return hit
+
+
+def _content_key(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        h = hashlib.sha256(values.cat.codes.to_numpy().tobytes())
+        h.update(pd.util.hash_pandas_object(values.cat.categories.to_series(), index=False).to_numpy().tobytes())
+    else:
+        h = hashlib.sha256(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# Fungsi untuk mengambil indeks member dari data member; indeks dibuat sekali per isi sheet
+def member_index(pelanggan_data):
+    key = _content_key(pelanggan_data["ID Customer"])
+    with _lock:
+        if key in _index_cache:
+            _index_cache.move_to_end(key)
+            return _index_cache[key]
+    index = MemberIndex(pelanggan_data["ID Customer"])
+    with _lock:
+        _index_cache[key] = index
+        while len(_index_cache) > 8:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def clear_cache():
+    with _lock:
+        _index_cache.clear()
+
+
+# Fungsi untuk mengidentifikasi pelanggan terdaftar yang tidak bertransaksi.
+# Mengembalikan data member dengan kolom "Bertransaksi" dan daftar yang tidak bertransaksi.
+def non_transacting(sales_data, pelanggan_data, index=None):
+    return _mark_transacting(pelanggan_data, sales_data["ID Customer"], sales_data["Terdaftar di form"] == 1, index)
+
+
+# Sama seperti non_transacting, tetapi dari partial per pelanggan per bulan (aggregate_store)
+def non_transacting_from_partials(partials, pelanggan_data, index=None):
+    return _mark_transacting(pelanggan_data, partials["ID Customer"], partials["Transaksi Terdaftar"] > 0, index)
+
+
+def _mark_transacting(pelanggan_data, id_customer, terdaftar, index=None):
+    if index is None:
+        index = member_index(pelanggan_data)
+    codes = index.codes(pelanggan_data["ID Customer"])
+    hit = np.append(index.present(id_customer, terdaftar), False)  # kode -1 (bukan member) -> False
+    pelanggan_data = pelanggan_data.assign(Bertransaksi=hit[codes])
+    no_transactions = pelanggan_data[~pelanggan_data["Bertransaksi"]]
+    return pelanggan_data, no_transactions
+
+
+# Fungsi untuk menghitung jumlah pelanggan terdaftar (semua ID di data member) dan
+# tidak terdaftar (ID yang bertransaksi tetapi tidak ada di data member)
+def customer_totals(id_customer, index):
+    id_customer = pd.Series(id_customer)
+    if isinstance(id_customer.dtype, pd.CategoricalDtype):
+        codes = id_customer.cat.codes.to_numpy()
+        observed = np.bincount(codes[codes >= 0], minlength=len(id_customer.cat.categories)) > 0
+        bukan_member = ~index.contains(pd.Series(id_customer.cat.categories))
+        tidak_terdaftar = int((observed & bukan_member).sum())
+    else:
+        unique = pd.Series(id_customer.dropna().unique())
+        tidak_terdaftar = int((~index.contains(unique)).sum())
+    return {"terdaftar": len(index), "tidak_terdaftar": tidak_terdaftar}
+
+
+# Fungsi untuk menghitung jumlah pelanggan terdaftar dan tidak terdaftar dari kolom
+# "Terdaftar di form" saja (jika data member tidak tersedia). Pelanggan dianggap
+# terdaftar jika minimal satu transaksinya bertanda terdaftar.
+def customer_totals_by_flag(id_customer, terdaftar):
+    codes, unique = pd.factorize(pd.Series(id_customer))
+    terdaftar = np.asarray(terdaftar, dtype=bool)
+    valid = codes >= 0
+    registered = np.zeros(len(unique), dtype=bool)
+    registered[codes[valid & terdaftar]] = True
+    return {"terdaftar": int(registered.sum()), "tidak_terdaftar": int(len(unique) - registered.sum())}
@@ -0,0 +1,86 @@
+import threading
+import weakref
+from itertools import count
+
+import pandas as pd
+
+from analitik import shared_cache
+
+# Memo hasil per bagian (section) halaman. Kunci sebuah bagian adalah nama bagian,
+# identitas DataFrame masukannya, dan parameter lainnya. DataFrame dari loader
+# adalah objek yang sama di setiap rerun Streamlit (diambil dari cache), jadi
+# identitasnya cukup dan tidak perlu meng-hash isinya. Token identitas dibuang
+# begitu DataFrame-nya dibebaskan, sehingga id() yang dipakai ulang tidak tertukar.
+# Hasilnya disimpan di cache bersama (namespace "memo"): DataFrame masukan berasal dari
+# cache sheet yang sama untuk semua sesi, jadi sesi lain dengan data yang sama langsung
+# memakai hasilnya, dan ukuran hasil ikut dihitung dalam batas memori bersama.
+_lock = threading.Lock()
+_keys = set()  # kunci hasil di shared_cache, untuk dibuang saat DataFrame masukan dibebaskan
+_tokens = {}  # id(objek) -> (weakref, token)
+_token_ids = {}  # token -> id(objek)
+_dead = []  # token objek yang sudah dibebaskan, dibersihkan di _purge()
+_counter = count()
+
+
+def _contains(frozen, token):
+    if frozen == token:
+        return True
+    return isinstance(frozen, tuple) and any(_contains(item, token) for item in frozen)
+
+
+# Membuang hasil milik DataFrame yang sudah dibebaskan (dipanggil dengan _lock terkunci).
+# Callback weakref hanya mencatat token-nya, karena bisa terpanggil kapan saja oleh GC.
+def _purge():
+    while _dead:
+        token = _dead.pop()
+        object_id = _token_ids.pop(token, None)
+        if object_id is not None and _tokens.get(object_id, (None, None))[1] == token:
+            del _tokens[object_id]
+        dead = [key for key in _keys if _contains(key, token)]
+        _keys.difference_update(dead)
+        shared_cache.discard(dead)
+
+
+def _token(obj):
+    entry = _tokens.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    token = ("obj", next(_counter))
+    _tokens[id(obj)] = (weakref.ref(obj, lambda _, token=token: _dead.append(token)), token)
+    _token_ids[token] = id(obj)
+    return token
+
+
+def _freeze(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return _token(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+# Fungsi untuk menjalankan satu bagian halaman sekali saja per kombinasi masukan.
+# Rerun dengan masukan yang sama langsung memakai hasil sebelumnya.
+#     info = memo.section("informasi_dasar", sales.basic_info, df)
+def section(name, func, *args, **kwargs):
+    with _lock:
+        _purge()
+        key = ("memo", name, _freeze(args), _freeze(kwargs))
+        _keys.add(key)
+        if len(_keys) > 4096:  # kunci yang sudah dibuang shared_cache tidak perlu diingat
+            _keys.intersection_update(shared_cache.keys("memo"))
+    return shared_cache.get_or_compute(key, func, *args, **kwargs)
+
+
+def clear():
+    with _lock:
+        _purge()
+        _keys.clear()
+    shared_cache.clear("memo")
+
+
+def cache_info():
+    stats = shared_cache.cache_info()["namespaces"].get("memo", {})
+    return {"entries": stats.get("entries", 0), "hit": stats.get("hit", 0), "miss": stats.get("miss", 0)}
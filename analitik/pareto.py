@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# Hasil analisis Pareto yang dipakai bersama oleh ringkasan teks, tabel, dan grafik
+@dataclass
+class ParetoResult:
+    threshold: float
+    total_penjualan: float
+    jumlah_customer: int
+    jumlah_transaksi: int
+    jumlah_customer_top: int
+    penjualan_top: float
+    customers: pd.DataFrame  # semua customer, urut dari penjualan terbesar
+    top_customers: pd.DataFrame  # customer yang menyumbang `threshold`% penjualan
+    chart_data: pd.DataFrame  # hanya N customer teratas untuk grafik
+
+
+# Fungsi untuk analisis Pareto: satu kali agregasi per customer (nama + total),
+# lalu batas kumulatif dicari dengan searchsorted. Grup diurutkan per ID dulu
+# agar customer dengan total yang sama tetap berurutan seperti sebelumnya.
+def pareto(df, threshold=80, top_n=30):
+    grouped = df.groupby('ID Customer', observed=True).agg(
+        Nama=('Nama', 'first'), **{'Total Penjualan': ('Total Penjualan', 'sum')})
+    grouped = grouped.sort_values(by='Total Penjualan', ascending=False, kind='stable').reset_index()
+
+    penjualan = grouped['Total Penjualan'].to_numpy()
+    total_penjualan = penjualan.sum()
+    cumulative = penjualan.cumsum() / total_penjualan * 100 if total_penjualan else np.zeros(len(penjualan))
+    grouped['Cumulative Percentage'] = cumulative
+    # Kumulatif naik terus (diurutkan menurun), jadi baris <= threshold adalah awalan tabel
+    cutoff = int(np.searchsorted(cumulative, threshold, side='right'))
+    grouped[f'Above {threshold:g}%'] = np.arange(len(grouped)) < cutoff
+
+    top_customers = grouped.iloc[:cutoff]
+    return ParetoResult(
+        threshold=threshold,
+        total_penjualan=total_penjualan,
+        jumlah_customer=len(grouped),
+        jumlah_transaksi=int(df['Total Penjualan'].count()),
+        jumlah_customer_top=cutoff,
+        penjualan_top=top_customers['Total Penjualan'].sum(),
+        customers=grouped,
+        top_customers=top_customers,
+        chart_data=grouped.iloc[:top_n],
+    )
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Instrumentasi per tahap analisis: waktu wall, waktu CPU, puncak memori, dan jumlah baris.
+# Dalam keadaan mati, stage() hanya mengembalikan objek kosong (tanpa pengukuran apa pun).
+# Catatan disimpan per thread, dan Streamlit menjalankan setiap sesi di thread-nya sendiri.
+#
+# tracemalloc berlaku untuk seluruh proses: pelacakan dinyalakan saat tahap terluar pertama
+# (dari sesi mana pun) dimulai dan dimatikan lagi saat tahap terakhir yang terbuka selesai,
+# jadi tidak ada yang dilacak jika tidak ada sesi yang sedang mengukur. Karena itu puncak
+# memori juga dihitung untuk seluruh proses: jika beberapa sesi mengukur bersamaan, puncak
+# sebuah tahap ikut memuat alokasi sesi lain pada rentang waktu yang sama.
+DEFAULT_ENABLED = os.environ.get("DASHBOARD_PROFILE", "") not in ("", "0")
+
+logger = logging.getLogger(__name__)
+_state = threading.local()
+
+_lock = threading.Lock()
+_open = []  # tahap yang sedang berjalan di semua thread
+_started_tracing = False  # tracemalloc dinyalakan oleh modul ini (bukan dari luar)
+
+
+def _records():
+    if not hasattr(_state, "records"):
+        _state.records = []
+        _state.stack = []
+    return _state.records
+
+
+def is_enabled():
+    return getattr(_state, "enabled", DEFAULT_ENABLED)
+
+
+def enable(flag=True):
+    _state.enabled = bool(flag)
+
+
+# Fungsi untuk mengosongkan catatan (dipanggil di awal setiap rerun)
+def reset():
+    _state.records = []
+    _state.stack = []
+
+
+class _NullStage:
+    # Dipakai saat instrumentasi mati: semua atribut yang diisi diabaikan
+    __slots__ = ()
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, rows_in):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak_abs = 0
+
+    def __enter__(self):
+        global _started_tracing
+        _records()
+        with _lock:
+            if not _open and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # puncak semua tahap yang masih terbuka (juga di sesi lain) disimpan dulu
+            # sebelum penghitung puncak milik proses di-reset
+            for other in _open:
+                other.peak_abs = max(other.peak_abs, peak)
+            tracemalloc.reset_peak()
+            _open.append(self)
+        self.mem_start = current
+        self.depth = len(_state.stack)
+        _state.stack.append(self)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _started_tracing
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.thread_time() - self.cpu_start
+        with _lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_abs = max(self.peak_abs, peak)
+            _open.remove(self)
+            if not _open and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+        _state.stack.pop()
+        if _state.stack:
+            parent = _state.stack[-1]
+            parent.peak_abs = max(parent.peak_abs, self.peak_abs)
+        record = {
+            "stage": self.name,
+            "depth": self.depth,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_bytes": max(0, self.peak_abs - self.mem_start),
+            "net_bytes": current - self.mem_start,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "error": exc_type.__name__ if exc_type else None,
+            "time": time.time(),
+        }
+        _state.records.append(record)
+        logger.debug(json.dumps(record, default=str))
+        return False
+
+
+# Fungsi untuk mengukur satu tahap analisis:
+#     with profiler.stage("pareto", rows_in=len(df)) as s:
+#         hasil = pareto.pareto(df)
+#         s.rows_out = len(hasil.customers)
+def stage(name, rows_in=None):
+    if not is_enabled():
+        return _NULL
+    return _Stage(name, rows_in)
+
+
+def records():
+    return list(_records())
+
+
+def to_frame():
+    columns = ["stage", "depth", "wall_s", "cpu_s", "peak_bytes", "net_bytes", "rows_in", "rows_out", "error"]
+    return pd.DataFrame(records(), columns=columns + ["time"])[columns]
+
+
+# Catatan dalam format JSON Lines (satu tahap per baris) untuk diekspor
+def to_jsonl(**meta):
+    return "".join(json.dumps({**meta, **record}, default=str) + "\n" for record in records())
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Urutan segmen sesuai tampilan di halaman Segmentasi RFM
+SEGMENTS = ["Best Customers", "Loyal Customers", "Budget Buyers", "Churn Risk",
+            "Lost Customers", "Big Spenders", "Potential Customers", "OTHER"]
+SEGMENT_DTYPE = pd.CategoricalDtype(SEGMENTS)
+
+
+# Aturan kategorisasi pelanggan berdasarkan skor R, F, M
+def categorize_customer(r, f, m):
+    if r == 3 and f == 4 and m == 4:
+        return "Best Customers"
+    elif r == 3 and (f in [3, 4]) and (m in [3, 4]):
+        return "Loyal Customers"
+    elif r == 3 and (f in [3, 4]) and (m in [1, 2]):
+        return "Budget Buyers"
+    elif r in [1, 2] and f in [1, 2] and m in [2, 3]:
+        return "Churn Risk"
+    elif r == 1 and f == 1 and m == 1:
+        return "Lost Customers"
+    elif r in [1, 2, 3] and f in [1, 2] and m == 4:
+        return "Big Spenders"
+    elif r == 3 and f in [1, 2] and m in [2, 3, 4]:
+        return "Potential Customers"
+    else:
+        return "OTHER"
+
+
+# Tabel lookup kode segmen untuk semua kombinasi skor, indeks [R-1, F-1, M-1]
+_SEGMENT_LOOKUP = np.array([[[SEGMENTS.index(categorize_customer(r, f, m)) for m in range(1, 5)]
+                             for f in range(1, 5)] for r in range(1, 4)], dtype=np.int8)
+
+
+# Fungsi untuk menghitung Recency, Frequency, dan Monetary per pelanggan
+def compute_rfm(sales_data, snapshot_date):
+    grouped = sales_data.groupby("ID Customer", sort=True, observed=True)
+    rfm = grouped[["Nama"]].first()
+    rfm["Recency"] = (pd.Timestamp(snapshot_date) - grouped["Tanggal"].max()).dt.days
+    rfm["Frequency"] = grouped.size()
+    rfm["Monetary"] = grouped["Total Penjualan"].sum()
+    rfm[["Terdaftar di form", "Reseller"]] = grouped[["Terdaftar di form", "Reseller"]].first()
+    return rfm
+
+
+# Fungsi untuk menghitung Recency, Frequency, dan Monetary dari partial per pelanggan
+# per bulan (aggregate_store), tanpa membaca ulang baris transaksinya
+def compute_rfm_from_partials(partials, snapshot_date):
+    grouped = partials.groupby("ID Customer", sort=True, observed=True)
+    rfm = grouped[["Nama"]].first()
+    rfm["Recency"] = (pd.Timestamp(snapshot_date) - grouped["Tanggal Terakhir"].max()).dt.days
+    rfm["Frequency"] = grouped["Jumlah Transaksi"].sum()
+    rfm["Monetary"] = grouped["Total Penjualan"].sum()
+    rfm[["Terdaftar di form", "Reseller"]] = grouped[["Terdaftar di form", "Reseller"]].first()
+    return rfm
+
+
+# Fungsi untuk memberi skor R, F, M (batas nilai sama dengan versi sebelumnya)
+def score_rfm(recency, frequency, monetary):
+    recency = np.asarray(recency)
+    frequency = np.asarray(frequency)
+    monetary = np.asarray(monetary)
+    r_score = np.select([recency <= 30, (recency >= 31) & (recency <= 59)], [3, 2], 1)
+    f_score = np.select([frequency >= 12, (frequency >= 6) & (frequency <= 12), (frequency >= 3) & (frequency <= 5)],
+                        [4, 3, 2], 1)
+    m_score = np.select([monetary > 500000, (monetary >= 300000) & (monetary <= 500000),
+                         (monetary >= 100000) & (monetary <= 299000)], [4, 3, 2], 1)
+    return r_score.astype(np.int8), f_score.astype(np.int8), m_score.astype(np.int8)
+
+
+# Fungsi untuk menentukan segmen dari skor R, F, M lewat tabel lookup
+def segment(r_score, f_score, m_score):
+    codes = _SEGMENT_LOOKUP[np.asarray(r_score) - 1, np.asarray(f_score) - 1, np.asarray(m_score) - 1]
+    return pd.Categorical.from_codes(codes, dtype=SEGMENT_DTYPE)
+
+
+# Fungsi lengkap: tabel RFM beserta skor dan kategori pelanggan
+def rfm_analysis(sales_data, snapshot_date):
+    return _scored(compute_rfm(sales_data, snapshot_date))
+
+
+# Sama seperti rfm_analysis, tetapi dari partial per pelanggan per bulan
+def rfm_from_partials(partials, snapshot_date):
+    return _scored(compute_rfm_from_partials(partials, snapshot_date))
+
+
+def _scored(rfm):
+    r_score, f_score, m_score = score_rfm(rfm["Recency"], rfm["Frequency"], rfm["Monetary"])
+    rfm["R"] = r_score
+    rfm["F"] = f_score
+    rfm["M"] = m_score
+    rfm["Kategori"] = segment(r_score, f_score, m_score)
+    return rfm
@@ -0,0 +1,120 @@
+import warnings
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from analitik import timeseries
+
+
+# Fungsi untuk menghitung total penjualan per tanggal (tanggal tanpa transaksi diisi 0)
+def daily_totals(df):
+    return timeseries.daily_frame(df)[["Total Penjualan"]].reset_index()
+
+
+# Fungsi untuk informasi dasar: sampel data, struktur kolom, dan statistik deskriptif
+def basic_info(df):
+    buffer = StringIO()  # Membuat buffer untuk menampung output
+    df.info(buf=buffer, memory_usage='deep')
+
+    # Kolom 0/1 diperlakukan sebagai kategori sehingga tidak ikut statistik deskriptif
+    cols = ['Terdaftar di form', 'Reseller']
+    described = df.astype({col: 'category' for col in cols}) if set(cols).issubset(df.columns) else df
+    return {
+        "sample": df.head(),
+        "info": buffer.getvalue(),
+        "describe": described.describe(),
+        "memory_before": df.attrs.get("memory_before"),
+        "memory_after": df.attrs.get("memory_after"),
+    }
+
+
+# Fungsi untuk metrik analisis lanjutan. Metrik hanya dihitung jika kolomnya tersedia.
+def advanced_metrics(df):
+    metrics = {}
+    # Modus pelanggan terdaftar
+    if 'Terdaftar di form' in df.columns:
+        metrics["modus_terdaftar"] = df['Terdaftar di form'].mode()[0]
+
+    # Rata-rata transaksi per orang
+    if 'ID Customer' in df.columns and 'Total Penjualan' in df.columns:
+        jumlah_customer = len(df.drop_duplicates(subset=['ID Customer']))
+        total_transaksi = df['Total Penjualan'].sum()
+        metrics["jumlah_customer"] = jumlah_customer
+        metrics["total_penjualan"] = total_transaksi
+        metrics["rata_rata_per_customer"] = total_transaksi / jumlah_customer
+
+    # Analisis transaksi reseller
+    if 'Reseller' in df.columns and 'Total Penjualan' in df.columns:
+        transaksi_reseller = df[df['Reseller'] == 1]['Total Penjualan']
+        jumlah_transaksi_reseller = len(transaksi_reseller)
+        metrics["total_penjualan_reseller"] = transaksi_reseller.sum()
+        metrics["jumlah_transaksi_reseller"] = jumlah_transaksi_reseller
+        metrics["rata_rata_reseller"] = (transaksi_reseller.sum() / jumlah_transaksi_reseller
+                                         if jumlah_transaksi_reseller > 0 else 0)
+    return metrics
+
+
+# Penilaian CV (dalam persen)
+def _assessment(cv):
+    if cv < 10:
+        return "Variasi kecil (Data sangat homogen dan tidak banyak berubah.)"
+    elif 10 <= cv <= 20:
+        return "Variasi sedang (Data cukup bervariasi tetapi masih dapat dianggap relatif stabil.)"
+    else:
+        return "Variasi besar (Data memiliki fluktuasi yang tinggi dan tidak stabil.)"
+
+
+# Jendela waktu untuk tabel CV. Selain "Per transaksi", nilai setiap kolom
+# dijumlahkan dulu per jendela (mis. total penjualan per hari) lalu dihitung CV-nya.
+CV_WINDOWS = ["Per transaksi", "Harian", "Mingguan", "Rolling 7 hari", "Per bulan"]
+
+
+# Fungsi untuk menghitung CV semua kolom numerik untuk semua jendela waktu sekaligus.
+# Total harian dihitung sekali untuk semua kolom; mingguan, rolling, dan bulanan
+# diturunkan dari total harian. Mean & std seluruh kolom dihitung per tabel.
+# Mengembalikan tabel rapi: Jendela, Kolom, Jumlah Periode, Mean, Std, CV, Penilaian.
+def cv_table(df, windows=None):
+    windows = CV_WINDOWS if windows is None else windows
+    numeric = df.select_dtypes("number")
+    numeric = numeric[[col for col in numeric.columns if not pd.api.types.is_bool_dtype(numeric[col])]]
+    frames = {}
+    if "Per transaksi" in windows:
+        frames["Per transaksi"] = numeric
+    if "Tanggal" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Tanggal"]) and not numeric.empty:
+        daily = numeric.groupby(df["Tanggal"].dt.normalize()).sum()
+        if not daily.empty:
+            # tanggal tanpa transaksi diisi 0, sama seperti grafik penjualan harian
+            daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max()), fill_value=0)
+        derived = {
+            "Harian": lambda: daily,
+            "Mingguan": lambda: daily.resample("W").sum(),
+            "Rolling 7 hari": lambda: daily.rolling(7).sum().dropna(),
+            "Per bulan": lambda: (numeric.groupby(df["Bulan"], observed=True).sum() if "Bulan" in df.columns
+                                  else daily.resample("MS").sum()),
+        }
+        for window in windows:
+            if window in derived:
+                frames[window] = derived[window]()
+
+    rows = []
+    for window, frame in frames.items():
+        values = frame.to_numpy(dtype="float64")
+        # sel kosong (NaN) dilewati; jumlah periode dihitung per kolom dari nilai yang terisi
+        counts = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # kolom tanpa nilai sama sekali
+            mean = np.nanmean(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+            std = np.nanstd(values, axis=0, ddof=0) if len(values) else np.full(values.shape[1], np.nan)
+            cv = np.where((mean != 0) & (counts >= 2), std / mean * 100, np.nan)
+        for col, n, m, sd, c in zip(frame.columns, counts, mean, std, cv):
+            if n < 2:
+                penilaian = "Data tidak cukup untuk menghitung CV (minimal 2 periode)."
+            elif m == 0:
+                penilaian = "Mean is zero, CV cannot be calculated."
+            elif not np.isfinite(c):
+                penilaian = "CV tidak dapat dihitung (nilai tidak valid)."
+            else:
+                penilaian = _assessment(c)
+            rows.append((window, col, int(n), m, sd, c, penilaian))
+    return pd.DataFrame(rows, columns=["Jendela", "Kolom", "Jumlah Periode", "Mean", "Std", "CV", "Penilaian"])
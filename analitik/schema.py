@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# Skema kolom data penjualan dan data member. Tipe yang dipakai:
+# - "datetime": datetime64
+# - "category": kategori (ID dan nama banyak yang berulang)
+# - "flag": kolom 0/1, disimpan sebagai uint8
+# - "amount": angka, diturunkan ke tipe terkecil yang aman
+SALES_SCHEMA = {
+    "Tanggal": "datetime",
+    "ID Customer": "category",
+    "Nama": "category",
+    "Terdaftar di form": "flag",
+    "Reseller": "flag",
+    "Total Penjualan": "amount",
+}
+MEMBER_SCHEMA = {
+    "id customer": "category",
+}
+
+
+def _to_datetime(col):
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    try:
+        return pd.to_datetime(col)
+    except (ValueError, TypeError, OverflowError):
+        return col  # tanggal yang tidak valid dibiarkan apa adanya
+
+
+def _to_flag(col):
+    if col.isna().any() or not pd.api.types.is_numeric_dtype(col):
+        return col
+    if not col.isin([0, 1]).all():
+        return col
+    return col.astype(np.uint8)
+
+
+def _to_amount(col):
+    if not pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col):
+        return col
+    if pd.api.types.is_integer_dtype(col):
+        return pd.to_numeric(col, downcast="integer")
+    # Float tetap float64: float32 bisa mengubah nilai penjualan yang besar
+    return col
+
+
+_CONVERTERS = {
+    "datetime": _to_datetime,
+    "category": lambda col: col if isinstance(col.dtype, pd.CategoricalDtype) else col.astype("category"),
+    "flag": _to_flag,
+    "amount": _to_amount,
+}
+
+
+# Fungsi untuk menerapkan skema ke sheet yang baru dibaca. Kolom yang tidak
+# dikenal dibiarkan. Ukuran memori sebelum/sesudah disimpan di df.attrs.
+def apply_schema(df, schema=None):
+    if schema is None:
+        schema = {**SALES_SCHEMA, **MEMBER_SCHEMA}
+    before = int(df.memory_usage(index=True, deep=True).sum())
+    converted = {col: _CONVERTERS[kind](df[col]) for col, kind in schema.items() if col in df.columns}
+    df = df.assign(**converted) if converted else df
+    df.attrs["memory_before"] = before
+    df.attrs["memory_after"] = int(df.memory_usage(index=True, deep=True).sum())
+    return df
@@ -0,0 +1,288 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Cache bersama untuk satu proses server Streamlit. Sheet yang sudah diparsing dan hasil
+# olahan (Pareto, kuartil, RFM, ...) disimpan sekali per isi data, lalu dipakai bersama
+# oleh semua sesi. Dua orang yang membuka workbook yang sama mendapat objek yang sama,
+# jadi memori bertambah sesuai jumlah dataset yang berbeda, bukan jumlah pengguna.
+# Nilai yang disimpan hanya boleh dibaca (gunakan .assign / .copy() untuk mengubahnya).
+#
+# Setiap sesi (pemilik) memegang referensi ke entri yang dipakai pada rerun terakhirnya.
+# Entri yang masih direferensikan tidak dibuang; sisanya dibuang dari yang paling lama
+# tidak dipakai (LRU) jika total ukuran melebihi MAX_BYTES.
+MAX_BYTES = int(os.environ.get("DASHBOARD_MEMORY_BYTES", 1024 ** 3))
+
+# Sesi yang tidak melakukan rerun selama ini dianggap sudah ditutup dan referensinya dilepas.
+# Jika begin() diberi fungsi `active`, sesi yang sudah ditutup dilepas lebih cepat (lihat _expire).
+OWNER_TTL = 30 * 60
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # kunci -> _Entry (urutan LRU)
+_owners = {}  # pemilik -> [set kunci yang dipegang, waktu terakhir aktif]
+_inflight = {}  # kunci yang sedang dihitung -> threading.Lock
+_stats = {}  # namespace (elemen pertama kunci) -> {"hit", "miss", "evict"}
+_state = threading.local()
+_shared = {}  # id objek data -> [byte, jumlah entri yang memuatnya]
+_bytes = 0  # total ukuran semua entri, objek data yang dipakai bersama dihitung sekali
+_active = None  # fungsi pemilik -> masih aktif?, dari begin()
+
+
+class _Entry:
+    __slots__ = ("value", "size", "parts", "refs")
+
+    def __init__(self, value, size, parts=None):
+        self.value = value
+        self.size = size
+        self.parts = parts or {}  # id -> (objek data, byte), dihitung sekali untuk semua entri
+        self.refs = 0
+
+
+# Menelusuri nilai: objek data (DataFrame, Series, Index, array, bytes) dikumpulkan ke
+# `parts` per id, sedangkan overhead wadahnya (tuple/dict/list, dataclass) dikembalikan.
+# Array yang merupakan view dihitung sebagai array asalnya, karena array itulah yang ditahan.
+def _walk(value, parts, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        parts[id(value)] = (value, int(usage.sum() if isinstance(usage, pd.Series) else usage))
+        return 0
+    if isinstance(value, pd.Index):
+        parts[id(value)] = (value, int(value.memory_usage(deep=True)))
+        return 0
+    if isinstance(value, np.ndarray):
+        while isinstance(value.base, np.ndarray):
+            value = value.base
+        parts[id(value)] = (value, int(value.nbytes))
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        parts[id(value)] = (value, sys.getsizeof(value))
+        return 0
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_walk(item, parts, seen) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_walk(k, parts, seen) + _walk(v, parts, seen) for k, v in value.items())
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + _walk(vars(value), parts, seen)
+    return sys.getsizeof(value)
+
+
+# Perkiraan ukuran objek di memori (DataFrame, array, bytes, tuple/dict/list, dataclass);
+# objek yang muncul beberapa kali di dalam nilai dihitung sekali
+def size_of(value):
+    parts = {}
+    overhead = _walk(value, parts, set())
+    return overhead + sum(size for _, size in parts.values())
+
+
+def _namespace(key):
+    return key[0] if isinstance(key, tuple) and key else key
+
+
+def _count(key, field):
+    stats = _stats.setdefault(_namespace(key), {"hit": 0, "miss": 0, "evict": 0})
+    stats[field] += 1
+
+
+# Menambah referensi pemilik yang sedang aktif di thread ini (dipanggil dengan _lock terkunci)
+def _pin(key, entry):
+    owner = getattr(_state, "owner", None)
+    if owner is None or owner not in _owners:
+        return
+    held = _owners[owner][0]
+    if key not in held:
+        held.add(key)
+        entry.refs += 1
+
+
+def _unpin(keys):
+    for key in keys:
+        entry = _entries.get(key)
+        if entry is not None:
+            entry.refs -= 1
+
+
+# Membuang satu entri beserta referensi sesi ke entri itu (dipanggil dengan _lock terkunci)
+def _drop(key):
+    global _bytes
+    entry = _entries.pop(key, None)
+    if entry is not None:
+        _bytes -= entry.size - sum(size for _, size in entry.parts.values())
+        for part_id in entry.parts:
+            shared = _shared[part_id]
+            shared[1] -= 1
+            if shared[1] == 0:
+                _bytes -= shared[0]
+                del _shared[part_id]
+        for held, _ in _owners.values():
+            held.discard(key)
+
+
+# Melepas referensi pemilik yang sudah tidak aktif atau tidak melakukan rerun selama
+# OWNER_TTL (dipanggil dengan _lock terkunci)
+def _expire(now, skip=None):
+    for other, (held, last_seen) in list(_owners.items()):
+        if other == skip:
+            continue
+        if now - last_seen > OWNER_TTL or (_active is not None and not _active(other)):
+            _unpin(held)
+            del _owners[other]
+
+
+def _evict(keep=None):
+    if _bytes <= MAX_BYTES:
+        return
+    _expire(time.monotonic())  # sesi yang sudah ditutup tidak boleh menahan entri melewati batas
+    for key in [key for key, entry in _entries.items() if entry.refs <= 0 and key != keep]:
+        _drop(key)
+        _count(key, "evict")
+        if _bytes <= MAX_BYTES:
+            break
+
+
+# Fungsi untuk menandai awal rerun sebuah sesi. Referensi dari rerun sebelumnya dilepas;
+# entri yang dipakai lagi pada rerun ini akan direferensikan ulang oleh get/put.
+# Pemilik None (mis. laporan batch) tidak memegang referensi apa pun.
+# `active` (opsional) memeriksa apakah pemilik lain masih terhubung, mis.
+# Runtime.is_active_session di Streamlit; referensi sesi yang sudah ditutup langsung dilepas.
+def begin(owner, active=None):
+    global _active
+    _state.owner = owner
+    now = time.monotonic()
+    with _lock:
+        if active is not None:
+            _active = active
+        held, _ = _owners.pop(owner, (set(), None))
+        _unpin(held)
+        _expire(now, skip=owner)
+        if owner is not None:
+            _owners[owner] = [set(), now]
+        _evict()
+
+
+# Fungsi untuk melepas semua referensi sebuah sesi (mis. saat sesi ditutup)
+def release(owner):
+    with _lock:
+        held, _ = _owners.pop(owner, (set(), None))
+        _unpin(held)
+        _evict()
+    if getattr(_state, "owner", None) == owner:
+        _state.owner = None
+
+
+_MISSING = object()
+
+
+# Fungsi untuk mengambil nilai dari cache; mengembalikan `default` jika tidak ada
+def get(key, default=None):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _count(key, "miss")
+            return default
+        _entries.move_to_end(key)
+        _count(key, "hit")
+        _pin(key, entry)
+        return entry.value
+
+
+# Fungsi untuk menyimpan nilai. Jika kunci sudah ada (dihitung bersamaan oleh sesi lain),
+# nilai yang sudah tersimpan yang dikembalikan agar semua sesi memakai objek yang sama.
+# Nilai yang baru disimpan selalu dipertahankan, meskipun sendirian melebihi batas.
+# Objek data yang juga dimuat entri lain (mis. TableView dan DataFrame sumbernya) hanya
+# menambah total ukuran sekali; `size` yang diberikan langsung dihitung apa adanya.
+def put(key, value, size=None):
+    global _bytes
+    parts = {}
+    if size is None:
+        overhead = _walk(value, parts, set())
+        size = overhead + sum(part_size for _, part_size in parts.values())
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _entries[key] = _Entry(value, size, parts)
+            _bytes += size - sum(part_size for _, part_size in parts.values())
+            for part_id, (_, part_size) in parts.items():
+                shared = _shared.setdefault(part_id, [part_size, 0])
+                if shared[1] == 0:
+                    _bytes += part_size
+                shared[1] += 1
+        _entries.move_to_end(key)
+        _pin(key, entry)
+        _evict(keep=key)
+        return entry.value
+
+
+# Fungsi untuk mengambil hasil dari cache atau menghitungnya sekali saja. Sesi lain yang
+# meminta kunci yang sama saat hasilnya sedang dihitung menunggu, bukan menghitung ulang.
+def get_or_compute(key, func, *args, **kwargs):
+    value = get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    with _lock:
+        key_lock = _inflight.setdefault(key, threading.Lock())
+    with key_lock:
+        with _lock:
+            entry = _entries.get(key)
+            if entry is not None:  # sudah dihitung oleh sesi lain selama menunggu
+                _entries.move_to_end(key)
+                _pin(key, entry)
+                return entry.value
+        try:
+            return put(key, func(*args, **kwargs))
+        finally:
+            with _lock:
+                _inflight.pop(key, None)
+
+
+# Fungsi untuk membuang entri tertentu (referensi sesi ke entri itu ikut hilang)
+def discard(keys):
+    with _lock:
+        for key in keys:
+            _drop(key)
+
+
+# Fungsi untuk mengosongkan cache; namespace=None menghapus semua entri
+def clear(namespace=None):
+    with _lock:
+        for key in [key for key in _entries if namespace is None or _namespace(key) == namespace]:
+            _drop(key)
+        if namespace is None:
+            _stats.clear()
+        else:
+            _stats.pop(namespace, None)
+
+
+def keys(namespace=None):
+    with _lock:
+        return [key for key in _entries if namespace is None or _namespace(key) == namespace]
+
+
+# Ringkasan cache: total dan per namespace (jumlah entri, byte, hit, miss, evict).
+# Byte per namespace adalah ukuran penuh tiap entri, jadi objek yang dipakai bersama oleh
+# beberapa entri terhitung di masing-masing; total `bytes` menghitungnya sekali.
+def cache_info():
+    with _lock:
+        namespaces = {name: {"entries": 0, "bytes": 0, **stats} for name, stats in _stats.items()}
+        pinned = 0
+        for key, entry in _entries.items():
+            stats = namespaces.setdefault(_namespace(key), {"entries": 0, "bytes": 0, "hit": 0, "miss": 0, "evict": 0})
+            stats["entries"] += 1
+            stats["bytes"] += entry.size
+            pinned += entry.refs > 0
+        return {"entries": len(_entries), "bytes": _bytes, "max_bytes": MAX_BYTES, "pinned": pinned,
+                "sessions": len(_owners), "namespaces": namespaces}
+
+
+def to_frame():
+    info = cache_info()
+    columns = ["entries", "bytes", "hit", "miss", "evict"]
+    frame = pd.DataFrame.from_dict(info["namespaces"], orient="index", columns=columns)
+    return frame.rename_axis("namespace").reset_index()
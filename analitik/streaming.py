@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    import resource
+except ImportError:  # tidak tersedia di Windows
+    resource = None
+
+from analitik import shared_cache
+from analitik.loader import file_hash, read_bytes
+from analitik.validation import REQUIRED_COLUMNS
+
+CHUNK_SIZE = 50_000
+# Hasil agregasi parsial digabung ulang jika jumlah barisnya melewati batas ini
+COMPACT_ROWS = 500_000
+
+
+# Fungsi untuk membaca sheet per potongan (chunk) dengan iterator read-only openpyxl,
+# sehingga sheet tidak pernah dimuat utuh ke memori. Jika ada kolom `required` yang tidak
+# ada di baris judul, hanya satu DataFrame kosong berisi judul kolom yang dihasilkan dan
+# baris data tidak dibaca sama sekali.
+def iter_chunks(source, sheet_name, chunk_size=CHUNK_SIZE, required=None):
+    # path dibaca langsung dari disk; upload Streamlit/bytes dibungkus BytesIO
+    data = source if isinstance(source, (str, os.PathLike)) else BytesIO(read_bytes(source))
+    wb = load_workbook(data, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        if any(col not in header for col in required or []):
+            yield pd.DataFrame(columns=header)
+            return
+        buffer = []
+        for row in rows:
+            if not any(cell is not None for cell in row):
+                continue  # baris kosong dilewati seperti pd.read_excel
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=header)
+    finally:
+        wb.close()
+
+
+class _Partial:
+    # Kumpulan hasil agregasi per chunk yang digabung secara berkala
+    def __init__(self, reduce):
+        self.parts = []
+        self.rows = 0
+        self.reduce = reduce
+
+    def add(self, part):
+        self.parts.append(part)
+        self.rows += len(part)
+        if self.rows > COMPACT_ROWS and len(self.parts) > 1:
+            self.compact()
+
+    def compact(self):
+        if len(self.parts) > 1:
+            self.parts = [self.reduce(pd.concat(self.parts))]
+            self.rows = len(self.parts[0])
+        return self.parts[0] if self.parts else None
+
+
+def _sum_by_index(df):
+    return df.groupby(level=0, sort=False).sum()
+
+
+def _customer_reduce(df):
+    return df.groupby(level=0, sort=False).agg({"Nama": "first", "Total Penjualan": "sum", "Jumlah Transaksi": "sum"})
+
+
+# Agregator inkremental: total per tanggal, total & jumlah transaksi per pelanggan,
+# serta ringkasan reseller dan status terdaftar. Memori yang dipakai sebanding
+# dengan jumlah tanggal/pelanggan unik, bukan jumlah baris.
+class StreamingSummary:
+    def __init__(self):
+        self.columns = None  # judul kolom sheet, diisi dari chunk pertama
+        self.rows = 0
+        self.chunks = 0
+        self.total_penjualan = 0
+        self.reseller_total = 0
+        self.reseller_count = 0
+        self.terdaftar_counts = pd.Series(dtype="int64")
+        self._per_tanggal = _Partial(_sum_by_index)
+        self._per_customer = _Partial(_customer_reduce)
+        self.peak_chunk_bytes = 0
+        self.seconds = 0.0
+
+    # Kolom yang dibutuhkan mode streaming tetapi tidak ada di sheet
+    @property
+    def missing(self):
+        if self.columns is None:
+            return []
+        return [col for col in REQUIRED_COLUMNS["streaming"] if col not in self.columns]
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+        penjualan = pd.to_numeric(chunk["Total Penjualan"], errors="coerce")
+        self.total_penjualan += penjualan.sum()
+
+        tanggal = pd.to_datetime(chunk["Tanggal"], errors="coerce", format="mixed")
+        self._per_tanggal.add(penjualan.groupby(tanggal, sort=False).sum().to_frame())
+
+        per_customer = pd.DataFrame({"Nama": chunk["Nama"] if "Nama" in chunk.columns else None,
+                                     "Total Penjualan": penjualan,
+                                     "Jumlah Transaksi": 1}).groupby(chunk["ID Customer"], sort=False)
+        self._per_customer.add(per_customer.agg({"Nama": "first", "Total Penjualan": "sum", "Jumlah Transaksi": "sum"}))
+
+        if "Reseller" in chunk.columns:
+            reseller = penjualan[chunk["Reseller"] == 1]
+            self.reseller_total += reseller.sum()
+            self.reseller_count += len(reseller)
+        if "Terdaftar di form" in chunk.columns:
+            counts = self.terdaftar_counts.add(chunk["Terdaftar di form"].value_counts(), fill_value=0)
+            self.terdaftar_counts = counts.astype("int64")
+
+    # Total penjualan per tanggal (tanggal tanpa transaksi diisi 0)
+    def per_tanggal(self):
+        per_tanggal = self._per_tanggal.compact()
+        if per_tanggal is None:
+            return pd.DataFrame(columns=["Tanggal", "Total Penjualan"])
+        per_tanggal = per_tanggal["Total Penjualan"]
+        # tanggal yang tidak bisa dibaca (NaT) tidak ikut; jika tidak ada yang tersisa, hasilnya kosong
+        per_tanggal = per_tanggal[per_tanggal.index.notna()].sort_index()
+        if per_tanggal.empty:
+            return pd.DataFrame(columns=["Tanggal", "Total Penjualan"])
+        date_range = pd.date_range(start=per_tanggal.index.min(), end=per_tanggal.index.max())
+        per_tanggal = per_tanggal.reindex(date_range, fill_value=0)
+        return per_tanggal.rename_axis("Tanggal").reset_index()
+
+    # Total penjualan dan jumlah transaksi per pelanggan
+    def per_customer(self):
+        per_customer = self._per_customer.compact()
+        if per_customer is None:
+            return pd.DataFrame(columns=["ID Customer", "Nama", "Total Penjualan", "Jumlah Transaksi"])
+        return per_customer.rename_axis("ID Customer").reset_index()
+
+    def state_bytes(self):
+        parts = self._per_tanggal.parts + self._per_customer.parts
+        return int(sum(part.memory_usage(deep=True).sum() for part in parts))
+
+    # Laporan pemakaian memori: chunk terbesar, state agregator, dan puncak RSS proses
+    def memory_report(self):
+        report = {"baris": self.rows, "chunk": self.chunks, "detik": round(self.seconds, 3),
+                  "chunk_terbesar_bytes": self.peak_chunk_bytes, "state_agregator_bytes": self.state_bytes()}
+        if resource is not None:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss dalam KB di Linux, dalam byte di macOS
+            report["puncak_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+        return report
+
+
+# Fungsi untuk meringkas satu sheet secara streaming.
+# Ringkasan (yang ukurannya kecil) disimpan di cache bersama agar rerun Streamlit tidak
+# membaca ulang file, dan sesi lain yang meminta sheet yang sama menunggu hasil yang sama.
+# Jika kolom yang dibutuhkan tidak ada, ringkasan hanya berisi judul kolom (lihat missing).
+def summarize_sheet(source, sheet_name, chunk_size=CHUNK_SIZE):
+    return shared_cache.get_or_compute(("streaming", file_hash(source), sheet_name), _summarize, source, sheet_name, chunk_size)
+
+
+def _summarize(source, sheet_name, chunk_size):
+    summary = StreamingSummary()
+    start = time.perf_counter()
+    for chunk in iter_chunks(source, sheet_name, chunk_size, required=REQUIRED_COLUMNS["streaming"]):
+        if summary.columns is None:
+            summary.columns = [str(col) for col in chunk.columns]
+            if summary.missing:
+                break
+        summary.update(chunk)
+    summary.seconds = time.perf_counter() - start
+    return summary
@@ -0,0 +1,92 @@
+import importlib.util
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# Tabel hasil yang besar tidak dikirim utuh ke browser: hanya satu halaman yang
+# dikirim, sedangkan pengurutan dan penyaringan dikerjakan di server memakai
+# urutan (argsort) per kolom yang dibuat sekali lalu disimpan.
+PAGE_SIZES = [25, 50, 100, 500]
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class TableView:
+    def __init__(self, df):
+        # indeks bernama (mis. ID Customer di tabel RFM) dijadikan kolom biasa
+        self.df = df.reset_index() if df.index.name is not None else df
+        self._lock = threading.Lock()
+        self._orders = {}  # (kolom, naik) -> posisi baris terurut
+        self._masks = OrderedDict()  # (kolom, teks) -> penanda baris yang cocok
+
+    def __len__(self):
+        return len(self.df)
+
+    # Urutan baris untuk satu kolom (stabil, nilai kosong di akhir)
+    def order(self, column, ascending=True):
+        key = (column, ascending)
+        with self._lock:
+            if key in self._orders:
+                return self._orders[key]
+        col = self.df[column]
+        order = col.reset_index(drop=True).sort_values(ascending=ascending, kind="stable",
+                                                       na_position="last").index.to_numpy()
+        with self._lock:
+            self._orders[key] = order
+        return order
+
+    # Penanda baris yang kolomnya memuat teks (tanpa membedakan huruf besar/kecil).
+    # Kolom kategori cukup dicocokkan per kategori lalu disebarkan lewat kodenya.
+    def mask(self, column, text):
+        key = (column, text)
+        with self._lock:
+            if key in self._masks:
+                self._masks.move_to_end(key)
+                return self._masks[key]
+        col = self.df[column]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            cocok = col.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+            codes = col.cat.codes.to_numpy()
+            mask = np.append(np.asarray(cocok, dtype=bool), False)[codes]  # kode -1 (kosong) -> False
+        else:
+            mask = col.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > 16:
+                self._masks.popitem(last=False)
+        return mask
+
+    # Posisi baris setelah disaring dan diurutkan
+    def positions(self, sort_by=None, ascending=True, filter_column=None, filter_text=""):
+        positions = self.order(sort_by, ascending) if sort_by else np.arange(len(self.df))
+        if filter_column and filter_text:
+            positions = positions[self.mask(filter_column, filter_text)[positions]]
+        return positions
+
+    # Fungsi untuk mengambil satu halaman. Mengembalikan (DataFrame halaman, jumlah baris hasil saringan).
+    def page(self, page=1, page_size=PAGE_SIZES[0], **query):
+        positions = self.positions(**query)
+        start = (max(1, page) - 1) * page_size
+        return self.df.iloc[positions[start:start + page_size]], len(positions)
+
+
+# Fungsi untuk mengekspor DataFrame ke CSV per potongan baris agar tidak membuat
+# satu string raksasa di memori
+def to_csv_bytes(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    buffer = BytesIO()
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        buffer.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+    return buffer.getvalue()
+
+
+def to_parquet_bytes(df):
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
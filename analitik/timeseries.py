@@ -0,0 +1,114 @@
+import threading
+
+import pandas as pd
+
+# Deret waktu penjualan: total harian dibuat sekali dari baris transaksi, lalu tampilan
+# mingguan, bulanan, per hari dalam minggu, dan rata-rata bergerak diturunkan dari deret
+# harian itu (beberapa ratus baris), tanpa mengelompokkan ulang baris transaksinya.
+# Deret harian beberapa sheet cukup dijumlahkan untuk mendapat deret gabungan.
+GRANULARITIES = ["Harian", "Mingguan", "Bulanan", "Hari dalam minggu"]
+DAILY_COLUMNS = ["Total Penjualan", "Jumlah Transaksi"]
+DAY_NAMES = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+# Rentang (hari) maksimum yang masih nyaman dibaca sebagai satu batang per hari
+MAX_DAILY_BARS = 62
+
+# Minggu Senin-Minggu diberi label tanggal Senin-nya, bulan diberi label tanggal 1
+_RULES = {"Mingguan": dict(rule="W-MON", label="left", closed="left"), "Bulanan": dict(rule="MS")}
+_LABELS = {"Harian": "%Y-%m-%d", "Mingguan": "%Y-%m-%d", "Bulanan": "%Y-%m"}
+
+
+# Fungsi untuk melengkapi deret harian: tanggal tanpa transaksi diisi 0
+def _fill(daily):
+    daily = daily.sort_index()
+    if not daily.empty:
+        daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max()), fill_value=0)
+    return daily.rename_axis("Tanggal")
+
+
+def _empty():
+    return pd.DataFrame({col: pd.Series(dtype="float64") for col in DAILY_COLUMNS},
+                        index=pd.DatetimeIndex([], name="Tanggal"))
+
+
+# Fungsi untuk membuat deret harian (Total Penjualan dan Jumlah Transaksi per tanggal)
+# dari baris transaksi satu sheet atau gabungan beberapa sheet
+def daily_frame(df):
+    if "Tanggal" not in df.columns or not pd.api.types.is_datetime64_any_dtype(df["Tanggal"]):
+        return _empty()
+    tanggal = df["Tanggal"].dt.normalize()
+    daily = pd.DataFrame({"Jumlah Transaksi": tanggal.groupby(tanggal).size()})
+    if "Total Penjualan" in df.columns:
+        daily.insert(0, "Total Penjualan", df["Total Penjualan"].groupby(tanggal).sum())
+    else:
+        daily.insert(0, "Total Penjualan", 0)
+    return _fill(daily[DAILY_COLUMNS])
+
+
+# Fungsi untuk menggabungkan deret harian beberapa sheet (tanggal yang sama dijumlahkan)
+def combine(frames):
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _empty()
+    return _fill(pd.concat(frames).groupby(level=0).sum())
+
+
+class SalesSeries:
+    def __init__(self, daily):
+        self.daily = daily
+        self._lock = threading.Lock()
+        self._views = {}  # (granularitas, kolom, jendela rata-rata) -> DataFrame
+
+    # Deret dari baris transaksi (satu sheet atau gabungan beberapa sheet)
+    @classmethod
+    def from_rows(cls, df):
+        return cls(daily_frame(df))
+
+    # Deret dari tabel total per tanggal yang sudah jadi (mis. mode streaming)
+    @classmethod
+    def from_totals(cls, per_tanggal):
+        return cls(_fill(per_tanggal.set_index("Tanggal")))
+
+    def __len__(self):
+        return len(self.daily)
+
+    @property
+    def columns(self):
+        return [col for col in DAILY_COLUMNS if col in self.daily.columns]
+
+    # Granularitas awal yang disarankan: harian untuk rentang pendek, mingguan jika lebih panjang
+    def default_granularity(self):
+        return "Harian" if len(self.daily) <= MAX_DAILY_BARS else "Mingguan"
+
+    def _resample(self, granularity, column):
+        values = self.daily[column]
+        if granularity == "Harian":
+            return values
+        if granularity in _RULES:
+            return values.resample(**_RULES[granularity]).sum()
+        if granularity == "Hari dalam minggu":
+            # rata-rata per hari, agar hari yang lebih sering muncul dalam rentang tidak lebih besar
+            per_day = values.groupby(values.index.dayofweek).mean().reindex(range(7))
+            return per_day.set_axis(DAY_NAMES)
+        raise ValueError(f"Granularitas tidak dikenal: {granularity}")
+
+    # Fungsi untuk mengambil satu tampilan deret: kolom Periode (label), nilai, dan jika
+    # moving_average > 1, rata-rata bergerak sepanjang jumlah periode tersebut (tidak
+    # berlaku untuk "Hari dalam minggu" karena urutannya bukan urutan waktu).
+    # Tampilan disimpan per kombinasi parameter, jadi pemanggilan ulang tidak menghitung lagi.
+    def view(self, granularity="Harian", column="Total Penjualan", moving_average=None):
+        if granularity not in _LABELS:
+            moving_average = None
+        key = (granularity, column, moving_average or None)
+        with self._lock:
+            if key in self._views:
+                return self._views[key]
+        values = self._resample(granularity, column)
+        view = pd.DataFrame({"Periode": values.index.strftime(_LABELS[granularity])
+                             if granularity in _LABELS else values.index,
+                             column: values.to_numpy()})
+        if moving_average and moving_average > 1:
+            view[f"Rata-rata {moving_average} periode"] = values.rolling(moving_average).mean().to_numpy()
+        with self._lock:
+            self._views[key] = view
+        return view
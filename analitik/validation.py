@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from analitik.schema import MEMBER_SCHEMA, SALES_SCHEMA
+
+# Validasi data dijalankan sekali saat sheet dimuat (lihat loader), bukan di setiap
+# analisis. Semua pemeriksaan tervektorisasi per kolom: tipe data sesuai skema, kolom
+# 0/1, ID kosong, tanggal yang tidak bisa dibaca, dan ID member ganda. Hasilnya berupa
+# laporan dengan posisi baris yang bermasalah, yang disimpan di cache bersama.
+
+# Kolom yang dibutuhkan setiap analisis
+REQUIRED_COLUMNS = {
+    "tren": ["Tanggal"],
+    "pareto": ["ID Customer", "Nama", "Total Penjualan"],
+    "frekuensi": ["ID Customer", "Terdaftar di form"],
+    "rfm": ["ID Customer", "Nama", "Tanggal", "Total Penjualan", "Terdaftar di form", "Reseller"],
+    "member": ["id customer"],
+    "streaming": ["ID Customer", "Tanggal", "Total Penjualan"],  # hanya judul kolom yang diperiksa
+}
+ISSUE_COLUMNS = ["Kolom", "Masalah", "Tingkat", "Jumlah Baris", "Contoh Baris Excel"]
+MAX_EXAMPLES = 5
+
+# Kolom ID: nilai kosong dilaporkan sebagai "ID kosong"; ID member juga harus unik
+_ID_COLUMNS = ["ID Customer", "id customer"]
+_UNIQUE = ["id customer"]
+
+
+@dataclass
+class ValidationReport:
+    rows: int
+    columns: list  # kolom yang ada di sheet
+    unusable: list  # kolom yang ada tetapi tipenya tidak bisa dipakai (mis. tanggal berupa teks)
+    issues: pd.DataFrame  # satu baris per (kolom, masalah), lihat ISSUE_COLUMNS
+    row_index: dict = field(default_factory=dict)  # (kolom, masalah) -> posisi baris (0 = baris data pertama)
+
+    @property
+    def ok(self):
+        return self.issues.empty
+
+    # Kolom yang dibutuhkan `analysis` (lihat REQUIRED_COLUMNS) tetapi tidak ada atau tidak bisa dipakai
+    def missing(self, analysis):
+        return [col for col in REQUIRED_COLUMNS[analysis] if col not in self.columns or col in self.unusable]
+
+    def usable(self, analysis):
+        return not self.missing(analysis)
+
+    # Posisi semua baris yang bermasalah (urut, tanpa duplikat)
+    def error_rows(self):
+        if not self.row_index:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate(list(self.row_index.values())))
+
+    def to_dict(self):
+        return {"rows": self.rows, "columns": list(self.columns), "unusable": list(self.unusable),
+                "issues": self.issues.to_dict(orient="records")}
+
+    # Laporan dari to_dict(); posisi baris tidak ikut disimpan, hanya contohnya
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["rows"], data["columns"], data["unusable"],
+                   pd.DataFrame(data["issues"], columns=ISSUE_COLUMNS))
+
+
+def _positions(mask):
+    return np.flatnonzero(np.asarray(mask, dtype=bool))
+
+
+def _check_column(values, kind):
+    """Mengembalikan (bisa dipakai, [(masalah, tingkat, penanda baris), ...]) untuk satu kolom."""
+    null = values.isna().to_numpy()
+    numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+    if kind == "datetime":
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return True, [("Tanggal kosong", "peringatan", null)]
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+        return False, [("Tanggal tidak bisa dibaca", "error", parsed.isna().to_numpy() & ~null),
+                       ("Tanggal kosong", "peringatan", null)]
+    if kind == "amount":
+        if numeric:
+            return True, [("Nilai kosong", "peringatan", null)]
+        parsed = pd.to_numeric(values.astype("object"), errors="coerce")
+        return False, [("Bukan angka", "error", parsed.isna().to_numpy() & ~null),
+                       ("Nilai kosong", "peringatan", null)]
+    if kind == "flag":
+        if numeric:
+            return True, [("Nilai selain 0/1", "peringatan", ~values.isin([0, 1]).to_numpy())]
+        return False, [("Nilai selain 0/1", "error", ~values.isin([0, 1, "0", "1"]).to_numpy())]
+    return True, [("Nilai kosong", "peringatan", null)]
+
+
+# Fungsi untuk memvalidasi satu sheet yang sudah melewati schema.apply_schema.
+# Kolom yang tidak ada tidak dilaporkan di sini, karena satu sheet bisa berupa data
+# penjualan atau data member; gunakan report.missing(analisis) untuk memeriksanya.
+def validate(df):
+    schema = {**SALES_SCHEMA, **MEMBER_SCHEMA}
+    found, unusable, row_index = [], [], {}
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        usable, checks = _check_column(df[col], kind)
+        if col in _ID_COLUMNS:
+            checks = [("ID kosong" if masalah == "Nilai kosong" else masalah, tingkat, mask)
+                      for masalah, tingkat, mask in checks]
+        if col in _UNIQUE:
+            values = df[col]
+            checks.append(("ID ganda", "peringatan", values.duplicated(keep=False).to_numpy() & values.notna().to_numpy()))
+        if not usable:
+            unusable.append(col)
+        for masalah, tingkat, mask in checks:
+            positions = _positions(mask)
+            if len(positions):
+                row_index[(col, masalah)] = positions
+                contoh = ", ".join(str(p + 2) for p in positions[:MAX_EXAMPLES])  # baris 1 = judul kolom
+                found.append((col, masalah, tingkat, len(positions), contoh))
+    issues = pd.DataFrame(found, columns=ISSUE_COLUMNS)
+    return ValidationReport(len(df), [str(c) for c in df.columns], unusable, issues, row_index)
+
+
+# Fungsi untuk menggabungkan laporan beberapa sheet ({sheet: laporan}). Kolom dianggap ada
+# jika ada di semua sheet, dan tidak bisa dipakai jika tidak bisa dipakai di salah satu sheet.
+def combine(reports):
+    if not reports:
+        return ValidationReport(0, [], [], pd.DataFrame(columns=["Sheet"] + ISSUE_COLUMNS))
+    columns = set.intersection(*(set(report.columns) for report in reports.values()))
+    unusable = set().union(*(report.unusable for report in reports.values()))
+    issues = pd.concat([report.issues.assign(Sheet=sheet) for sheet, report in reports.items()], ignore_index=True)
+    row_index = {(sheet, *key): positions for sheet, report in reports.items()
+                 for key, positions in report.row_index.items()}
+    first = next(iter(reports.values()))
+    return ValidationReport(sum(report.rows for report in reports.values()),
+                            [col for col in first.columns if col in columns], sorted(unusable),
+                            issues[["Sheet"] + ISSUE_COLUMNS], row_index)
+
+
+# Fungsi untuk mengambil baris yang bermasalah dari sheet, dengan nomor baris Excel-nya
+def invalid_rows(df, report):
+    positions = report.error_rows()
+    rows = df.iloc[positions]
+    return rows.assign(**{"Baris Excel": positions + 2})[["Baris Excel"] + list(df.columns)]
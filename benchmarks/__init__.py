@@ -0,0 +1 @@
+"""Benchmark Dashboard Evaluasi Penjualan dengan data sintetis."""
@@ -0,0 +1,178 @@
+"""Mengukur waktu dan memori setiap tahap analisis pada data sintetis.
+
+Contoh:
+    python -m benchmarks.run --rows 1000 100000 1000000 --sheets 1 12 36 --output bench.json
+
+Hasil disimpan sebagai JSON agar bisa dibandingkan antar versi.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Jika False, puncak memori tidak diukur (lebih cepat)
+MEASURE_MEMORY = True
+
+
+# Fungsi untuk mengukur satu tahap: waktu (wall) lalu puncak memori Python/numpy.
+# Keduanya diukur pada eksekusi terpisah karena tracemalloc memperlambat kode Python.
+# `setup` dipanggil sebelum setiap eksekusi (mis. untuk mengosongkan cache).
+def measure(stage, func, *args, setup=None, **kwargs):
+    if setup:
+        setup()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = None
+    if MEASURE_MEMORY:
+        if setup:
+            setup()
+        tracemalloc.start()
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, {"stage": stage, "seconds": round(seconds, 6), "peak_bytes": peak}
+
+
+# Partial per pelanggan per bulan dari frame di memori, dengan kolom dan tipe data yang
+# sama seperti aggregate_store.load_partials (untuk data yang terlalu besar untuk Excel)
+def month_partials(frames):
+    from analitik import aggregate_store
+
+    names = list(frames)
+    parts = [aggregate_store.month_partials(df) for df in frames.values()]
+    partials = pd.concat(parts, ignore_index=True)
+    partials["Bulan"] = pd.Categorical(np.repeat(names, [len(part) for part in parts]), categories=sorted(names))
+    for col in ["ID Customer", "Nama"]:
+        partials[col] = pd.Categorical(partials[col].astype(object))
+    return partials
+
+
+def run_case(rows, sheets, seed=0, excel_max_rows=200_000, workdir=None):
+    from analitik import aggregate_store, disk_cache, frequency, loader, members, pareto, rfm, sales
+    from analitik.schema import apply_schema
+
+    frames = synthetic.sales_data(rows, sheets, seed=seed)
+    member = synthetic.member_data(rows, seed=seed)
+    names = list(frames)
+    results = []
+
+    # Tahap 1: baca Excel (dilewati untuk data besar, menulis .xlsx-nya saja sangat lama)
+    per_sheet = -(-rows // sheets)
+    if rows <= excel_max_rows and per_sheet <= synthetic.EXCEL_MAX_ROWS:
+        path = Path(workdir) / f"sales_{rows}_{sheets}.xlsx"
+        synthetic.write_workbook(path, frames)
+        disk_cache.CACHE_DIR = Path(workdir) / "cache"
+        (sales_data, _), r = measure("excel_load", loader.load_sheets, path, names,
+                                     setup=lambda: loader.clear_cache(disk=True))
+        results.append(r)
+        _, r = measure("disk_cache_load", loader.load_sheets, path, names, setup=loader.clear_cache)
+        results.append(r)
+        # Penyimpanan agregat: diringkas dari sheet (cache disk) lalu dibaca ulang dari SQLite
+        _, r = measure("agregat_simpan", aggregate_store.load_partials, path, names, setup=aggregate_store.clear)
+        results.append(r)
+        (partials, _), r = measure("agregat_load", aggregate_store.load_partials, path, names)
+        results.append(r)
+    else:
+        # Digabung seperti loader.load_sheets: tipe data disamakan antar sheet (ID & Nama kategori)
+        schema_frames = {name: apply_schema(df) for name, df in frames.items()}
+        sales_data = loader.combine_sheets(schema_frames, names)
+        partials, r = measure("agregat_ringkas", month_partials, schema_frames)
+        results.append(r)
+
+    first = sales_data[sales_data["Bulan"] == names[0]]
+    _, r = measure("informasi_dasar", lambda: (sales.basic_info(first), sales.daily_totals(first),
+                                               sales.advanced_metrics(first)))
+    results.append(r)
+    _, r = measure("pareto", pareto.pareto, first)
+    results.append(r)
+    _, r = measure("kuartil_frekuensi", lambda: frequency.categorize_frequency(frequency.transactions_per_month(sales_data)))
+    results.append(r)
+    pelanggan_data = members.normalize_members(apply_schema(member))
+    _, r = measure("member_tidak_bertransaksi", members.non_transacting, sales_data, pelanggan_data)
+    results.append(r)
+    _, r = measure("rfm", rfm.rfm_analysis, sales_data, sales_data["Tanggal"].max())
+    results.append(r)
+
+    # Jalur yang dipakai dashboard: analisis dari partial per pelanggan per bulan
+    _, r = measure("kuartil_frekuensi_agregat",
+                   lambda: frequency.categorize_frequency(frequency.transactions_from_partials(partials)))
+    results.append(r)
+    _, r = measure("member_tidak_bertransaksi_agregat", members.non_transacting_from_partials, partials, pelanggan_data)
+    results.append(r)
+    _, r = measure("rfm_agregat", rfm.rfm_from_partials, partials, sales_data["Tanggal"].max())
+    results.append(r)
+
+    for r in results:
+        r.update(rows=rows, sheets=sheets)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--sheets", type=int, nargs="+", default=[1, 12])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--excel-max-rows", type=int, default=200_000,
+                        help="tahap baca Excel hanya dijalankan sampai jumlah baris ini")
+    parser.add_argument("--no-memory", action="store_true", help="hanya mengukur waktu")
+    parser.add_argument("--output", "-o", default="benchmark_hasil.json")
+    args = parser.parse_args(argv)
+
+    global MEASURE_MEMORY
+    MEASURE_MEMORY = not args.no_memory
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            for sheets in args.sheets:
+                if sheets > rows:
+                    continue
+                case = run_case(rows, sheets, args.seed, args.excel_max_rows, workdir)
+                for r in case:
+                    memori = f"{r['peak_bytes'] / 1024 ** 2:>10.1f} MB" if r["peak_bytes"] is not None else ""
+                    print(f"{r['rows']:>10,} baris {r['sheets']:>3} sheet  {r['stage']:<34}"
+                          f"{r['seconds']:>10.3f} s {memori}")
+                results.extend(case)
+
+    report = {
+        "meta": {
+            "waktu": dt.datetime.now().isoformat(timespec="seconds"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu": os.cpu_count(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
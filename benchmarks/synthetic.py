@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+BULAN = ["Januari", "Februari", "Maret", "April", "Mei", "Juni",
+         "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
+
+# Batas baris per sheet di Excel (.xlsx)
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def sheet_names(sheets, start_year=2024):
+    return [f"{BULAN[i % 12]} {start_year + i // 12}" for i in range(sheets)]
+
+
+# Fungsi untuk membuat data penjualan sintetis yang deterministik.
+# Baris dibagi rata ke `sheets` sheet bulanan; kolomnya sama dengan format dashboard.
+def sales_data(rows, sheets=1, customers=None, seed=0, start_year=2024):
+    rng = np.random.default_rng(seed)
+    customers = customers or max(10, rows // 10)
+    # Sebagian kecil customer sering berbelanja (distribusi Zipf) agar Pareto realistis
+    customer_ids = np.arange(1, customers + 1)
+    registered = rng.random(customers) < 0.4
+    reseller = rng.random(customers) < 0.1
+    frames = {}
+    per_sheet = np.full(sheets, rows // sheets)
+    per_sheet[: rows % sheets] += 1
+    for i, (name, n) in enumerate(zip(sheet_names(sheets, start_year), per_sheet)):
+        start = pd.Timestamp(start_year + i // 12, i % 12 + 1, 1)
+        idx = (rng.zipf(1.3, n) - 1) % customers
+        frames[name] = pd.DataFrame({
+            "Tanggal": start + pd.to_timedelta(rng.integers(0, start.days_in_month, n), unit="D"),
+            "ID Customer": customer_ids[idx].astype(str),
+            "Nama": np.char.add("Customer ", customer_ids[idx].astype(str)),
+            "Terdaftar di form": registered[idx].astype(np.int64),
+            "Reseller": reseller[idx].astype(np.int64),
+            "Total Penjualan": rng.integers(1, 100, n) * 5000,
+        })
+    return frames
+
+
+# Fungsi untuk membuat data member: semua customer terdaftar ditambah member yang tidak pernah bertransaksi
+def member_data(rows, customers=None, seed=0, extra=0.2):
+    rng = np.random.default_rng(seed)
+    customers = customers or max(10, rows // 10)
+    registered = np.flatnonzero(rng.random(customers) < 0.4) + 1
+    inactive = np.arange(customers + 1, customers + 1 + int(len(registered) * extra))
+    ids = np.concatenate([registered, inactive]).astype(str)
+    return pd.DataFrame({"id customer": ids})
+
+
+def write_workbook(path, frames):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
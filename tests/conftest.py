@@ -0,0 +1,14 @@
+import pytest
+
+from analitik import disk_cache, shared_cache
+
+
+# Cache disk dan penyimpanan agregat diarahkan ke folder sementara, dan cache bersama
+# dikosongkan, agar setiap uji tidak dipengaruhi uji lain atau cache milik pengguna
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.delenv("DASHBOARD_AGGREGATE_DB", raising=False)
+    shared_cache.clear()
+    yield
+    shared_cache.clear()
@@ -0,0 +1,35 @@
+import json
+
+import pandas as pd
+
+from analitik import batch
+
+
+def _write_workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def test_workbook_without_registration_column_skips_analyses(tmp_path):
+    sales = pd.DataFrame({"ID Customer": ["C1", "C2", "C1"], "Nama": ["Ani", "Budi", "Ani"],
+                          "Tanggal": pd.to_datetime(["2024-01-02", "2024-01-05", "2024-01-09"]),
+                          "Total Penjualan": [100000, 250000, 50000], "Reseller": [0, 1, 0]})
+    _write_workbook(tmp_path / "a.xlsx", {"Januari": sales})
+    _write_workbook(tmp_path / "member.xlsx", {"Member": pd.DataFrame({"id customer": ["C1", "C3"]})})
+
+    rc = batch.main([str(tmp_path / "a.xlsx"), "--output", str(tmp_path / "laporan"),
+                     "--member", str(tmp_path / "member.xlsx"), "--workers", "1", "--no-charts"])
+
+    assert rc == 0
+    out = tmp_path / "laporan" / "a"
+    report = json.loads((out / "ringkasan.json").read_text(encoding="utf-8"))
+    assert report["frekuensi"] == {"dilewati": ["Terdaftar di form"]}
+    assert report["rfm"] == {"dilewati": ["Terdaftar di form"]}
+    assert report["member_tidak_bertransaksi"] == {"dilewati": ["Terdaftar di form"]}
+    assert "pareto_top_customer.csv" in {p.name for p in (out / "Januari").iterdir()}
+    validasi = pd.read_csv(out / "validasi.csv")
+    dilewati = validasi[validasi["Masalah"].str.startswith("Analisis")]
+    assert set(dilewati["Masalah"]) == {"Analisis frekuensi dilewati", "Analisis rfm dilewati",
+                                        "Analisis member tidak bertransaksi dilewati"}
+    assert set(dilewati["Kolom"]) == {"Terdaftar di form"}
@@ -0,0 +1,90 @@
+import gc
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analitik import memo, shared_cache, tables
+
+
+def test_shared_objects_counted_once():
+    df = pd.DataFrame({"Total Penjualan": np.arange(100_000)})
+    shared_cache.put(("sheet", "a"), df)
+    size = shared_cache.cache_info()["bytes"]
+    shared_cache.put(("memo", "tabel"), tables.TableView(df))
+    # hanya overhead objek TableView yang bertambah, bukan DataFrame-nya lagi
+    assert shared_cache.cache_info()["bytes"] - size < 10_000
+
+    shared_cache.discard([("sheet", "a")])
+    assert shared_cache.cache_info()["bytes"] >= size  # DataFrame masih ditahan TableView
+    shared_cache.discard([("memo", "tabel")])
+    assert shared_cache.cache_info()["bytes"] == 0
+
+
+def test_array_views_charge_their_base():
+    base = np.arange(100_000)
+    shared_cache.put(("x", 1), base[:10])
+    shared_cache.put(("x", 2), base[10:])
+    assert shared_cache.cache_info()["bytes"] == base.nbytes
+
+
+def test_memo_section_reuses_result_until_frame_is_freed():
+    calls = []
+
+    def total(df):
+        calls.append(1)
+        return df["Total Penjualan"].sum()
+
+    df = pd.DataFrame({"Total Penjualan": [1, 2, 3]})
+    assert memo.section("total", total, df) == 6
+    assert memo.section("total", total, df) == 6
+    assert len(calls) == 1
+    # DataFrame lain dengan isi yang sama adalah masukan yang berbeda
+    assert memo.section("total", total, df.copy()) == 6
+    assert len(calls) == 2
+
+    del df
+    gc.collect()
+    memo.section("total", total, pd.DataFrame({"Total Penjualan": [4]}))
+    assert len(shared_cache.keys("memo")) == 1  # hasil milik DataFrame yang dibebaskan ikut dibuang
+
+
+def test_pinned_entries_survive_eviction(monkeypatch):
+    monkeypatch.setattr(shared_cache, "MAX_BYTES", 3000)
+    shared_cache.begin("sesi-a")
+    shared_cache.put(("sheet", "a"), b"a" * 1000)
+    shared_cache.begin(None)
+    shared_cache.put(("sheet", "b"), b"b" * 1000)
+    shared_cache.put(("sheet", "c"), b"c" * 1000)
+    # "b" paling lama tidak dipakai yang tidak dipegang sesi, jadi "b" yang dibuang, bukan "a"
+    assert shared_cache.keys("sheet") == [("sheet", "a"), ("sheet", "c")]
+    assert shared_cache.cache_info()["pinned"] == 1
+
+    shared_cache.release("sesi-a")
+    shared_cache.put(("sheet", "d"), b"d" * 1000)
+    assert ("sheet", "a") not in shared_cache.keys()
+
+
+def test_closed_sessions_release_their_entries(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_active", None)  # fungsi dari begin() dikembalikan setelah uji
+    shared_cache.begin("sesi-a")
+    shared_cache.put(("sheet", "a"), b"a")
+    shared_cache.begin("sesi-b", active=lambda owner: owner != "sesi-a")
+    assert shared_cache.cache_info()["pinned"] == 0
+    assert shared_cache.cache_info()["sessions"] == 1
+    shared_cache.release("sesi-b")
+
+
+def test_get_or_compute_runs_once_for_concurrent_callers():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"hasil"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: shared_cache.get_or_compute(("x", "lambat"), slow), range(4)))
+    assert results == [b"hasil"] * 4
+    assert len(calls) == 1
@@ -0,0 +1,148 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitik import aggregate_store, frequency, loader, rfm
+
+
+# Implementasi lama (per baris dengan apply) sebagai acuan: hasil versi tervektorisasi
+# harus sama persis, termasuk celah Monetary 299001-299999 yang mendapat skor 1.
+def get_rfm_score(recency, frequency, monetary):
+    r_score = 3 if recency <= 30 else 2 if 31 <= recency <= 59 else 1
+    f_score = 4 if frequency >= 12 else 3 if 6 <= frequency <= 12 else 2 if 3 <= frequency <= 5 else 1
+    m_score = 4 if monetary > 500000 else 3 if 300000 <= monetary <= 500000 else 2 if 100000 <= monetary <= 299000 else 1
+    return r_score, f_score, m_score
+
+
+def categorize_customer(r, f, m):
+    if r == 3 and f == 4 and m == 4:
+        return "Best Customers"
+    elif r == 3 and (f in [3, 4]) and (m in [3, 4]):
+        return "Loyal Customers"
+    elif r == 3 and (f in [3, 4]) and (m in [1, 2]):
+        return "Budget Buyers"
+    elif r in [1, 2] and f in [1, 2] and m in [2, 3]:
+        return "Churn Risk"
+    elif r == 1 and f == 1 and m == 1:
+        return "Lost Customers"
+    elif r in [1, 2, 3] and f in [1, 2] and m == 4:
+        return "Big Spenders"
+    elif r == 3 and f in [1, 2] and m in [2, 3, 4]:
+        return "Potential Customers"
+    else:
+        return "OTHER"
+
+
+def legacy_rfm(sales_data, snapshot_date):
+    result = sales_data.groupby("ID Customer").agg({
+        "Nama": "first",
+        "Tanggal": lambda x: (snapshot_date - x.max()).days,
+        "ID Customer": "count",
+        "Total Penjualan": "sum",
+        "Terdaftar di form": "first",
+        "Reseller": "first"})
+    result.rename(columns={"Tanggal": "Recency", "ID Customer": "Frequency", "Total Penjualan": "Monetary"},
+                  inplace=True)
+    result[["R", "F", "M"]] = result.apply(
+        lambda row: pd.Series(get_rfm_score(row["Recency"], row["Frequency"], row["Monetary"])), axis=1)
+    result["Kategori"] = result.apply(lambda row: categorize_customer(row["R"], row["F"], row["M"]), axis=1)
+    return result
+
+
+RECENCY = [0, 29, 30, 31, 58, 59, 60, 365]
+FREQUENCY = [1, 2, 3, 5, 6, 11, 12, 13]
+MONETARY = [0, 99999, 100000, 298999, 299000, 299001, 299500, 299999, 300000, 500000, 500001]
+SNAPSHOT = pd.Timestamp(2024, 12, 31)
+
+
+def test_score_boundaries_match_legacy():
+    combos = list(itertools.product(RECENCY, FREQUENCY, MONETARY))
+    recency, frequency, monetary = (np.array(values) for values in zip(*combos))
+    scores = np.column_stack(rfm.score_rfm(recency, frequency, monetary))
+    expected = np.array([get_rfm_score(r, f, m) for r, f, m in combos])
+    np.testing.assert_array_equal(scores, expected)
+
+
+@pytest.mark.parametrize("monetary, expected", [(99999, 1), (100000, 2), (299000, 2), (299500, 1),
+                                                (300000, 3), (500000, 3), (500001, 4)])
+def test_monetary_gap(monetary, expected):
+    assert rfm.score_rfm([0], [1], [monetary])[2][0] == expected
+
+
+def test_segment_lookup_covers_all_scores():
+    combos = list(itertools.product(range(1, 4), range(1, 5), range(1, 5)))
+    r_score, f_score, m_score = (np.array(values) for values in zip(*combos))
+    segments = rfm.segment(r_score, f_score, m_score)
+    assert list(segments) == [categorize_customer(r, f, m) for r, f, m in combos]
+
+
+# Satu pelanggan per kombinasi batas: Recency dari tanggal terakhir, Frequency dari
+# jumlah transaksi, Monetary dari total penjualannya
+def _boundary_sales():
+    rows = []
+    combos = itertools.product([30, 31, 59, 60], [2, 3, 5, 6, 12], [99999, 100000, 299000, 299500,
+                                                                   300000, 500000, 500001])
+    for customer, (recency, frequency, monetary) in enumerate(combos):
+        last = SNAPSHOT - pd.Timedelta(days=recency)
+        amounts = np.full(frequency, monetary // frequency)
+        amounts[0] += monetary - amounts.sum()
+        for i, amount in enumerate(amounts):
+            rows.append({"ID Customer": f"C{customer:04d}", "Nama": f"Pelanggan {customer}",
+                         "Tanggal": last - pd.Timedelta(days=i), "Total Penjualan": int(amount),
+                         "Terdaftar di form": customer % 2, "Reseller": customer % 3 == 0})
+    return pd.DataFrame(rows)
+
+
+def test_rfm_analysis_matches_legacy():
+    sales = _boundary_sales()
+    result = rfm.rfm_analysis(sales, SNAPSHOT)
+    expected = legacy_rfm(sales, SNAPSHOT)
+    assert list(result.index) == list(expected.index)
+    for col in ["Nama", "Recency", "Frequency", "Monetary", "Terdaftar di form", "Reseller", "R", "F", "M"]:
+        np.testing.assert_array_equal(result[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+    assert list(result["Kategori"].astype(str)) == list(expected["Kategori"])
+
+
+# Transaksi _boundary_sales dibagi ke sheet bulanan (Oktober-Desember 2024)
+def _monthly_sheets():
+    sales = _boundary_sales()
+    bulan = sales["Tanggal"].dt.strftime("%m %Y")
+    return {name: df.reset_index(drop=True) for name, df in sales.groupby(bulan)}
+
+
+def _write_workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def test_partials_match_transaction_rows(tmp_path):
+    sheets = _monthly_sheets()
+    path = tmp_path / "penjualan.xlsx"
+    _write_workbook(path, sheets)
+    sales_data, _ = loader.load_sheets(path, list(sheets))
+    partials, waktu = aggregate_store.load_partials(path, list(sheets))
+    assert set(waktu["Sumber"]) != {"agregat"}  # pertama kali: diringkas dari sheet
+
+    result = rfm.rfm_from_partials(partials, SNAPSHOT)
+    expected = rfm.rfm_analysis(sales_data, SNAPSHOT)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False,
+                                  check_index_type=False)
+
+    pd.testing.assert_frame_equal(frequency.transactions_from_partials(partials),
+                                  frequency.transactions_per_month(sales_data),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_partials_reused_from_store(tmp_path):
+    sheets = _monthly_sheets()
+    path = tmp_path / "penjualan.xlsx"
+    _write_workbook(path, sheets)
+    first, _ = aggregate_store.load_partials(path, list(sheets))
+    loader.clear_cache(disk=True)
+    # Sheet yang sama dalam urutan berbeda tidak dibaca ulang dari Excel
+    again, waktu = aggregate_store.load_partials(path, list(sheets)[::-1])
+    assert set(waktu["Sumber"]) == {"agregat"}
+    pd.testing.assert_frame_equal(rfm.rfm_from_partials(again, SNAPSHOT), rfm.rfm_from_partials(first, SNAPSHOT))
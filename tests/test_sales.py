@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitik import frequency, members, pareto, sales, streaming, validation
+from analitik.schema import apply_schema
+
+
+def test_cv_table_skips_missing_cells():
+    df = pd.DataFrame({"Tanggal": pd.date_range("2024-01-01", periods=6, freq="12h"),
+                       "Total Penjualan": [100000.0, np.nan, 250000.0, 400000.0, 150000.0, 300000.0]})
+    row = sales.cv_table(df, ["Per transaksi"]).iloc[0]
+    values = df["Total Penjualan"].dropna()
+    assert row["Jumlah Periode"] == 5
+    assert np.isclose(row["CV"], values.std(ddof=0) / values.mean() * 100)
+    assert row["Penilaian"].startswith("Variasi besar")
+
+
+def test_cv_table_column_without_values():
+    df = pd.DataFrame({"Total Penjualan": [np.nan, np.nan, 5.0]})
+    row = sales.cv_table(df, ["Per transaksi"]).iloc[0]
+    assert row["Jumlah Periode"] == 1
+    assert np.isnan(row["CV"])
+    assert row["Penilaian"].startswith("Data tidak cukup")
+
+
+def test_streaming_per_tanggal_without_valid_dates():
+    summary = streaming.StreamingSummary()
+    summary.update(pd.DataFrame({"ID Customer": ["a", "b"], "Tanggal": ["kemarin", "besok"],
+                                 "Total Penjualan": [1000, 2000]}))
+    assert summary.per_tanggal().empty
+    assert summary.total_penjualan == 3000
+
+
+# Implementasi lama (loop per bulan dengan apply) sebagai acuan kategori frekuensi
+def legacy_categorize_frequency(transactions_per_month):
+    data_per_pelanggan = []
+    kuartil_list = []
+    for bulan in transactions_per_month["Bulan"].unique():
+        df_bulan = transactions_per_month[transactions_per_month["Bulan"] == bulan].copy()
+        q1 = df_bulan["Jumlah Transaksi"].quantile(0.25)
+        q3 = df_bulan["Jumlah Transaksi"].quantile(0.75)
+        kuartil_list.append({"Bulan": bulan, "Q1": q1, "Q3": q3})
+        df_bulan["Kategori"] = df_bulan["Jumlah Transaksi"].apply(
+            lambda x: "Jarang" if x <= q1 else "Biasa" if x <= q3 else "Sering")
+        df_bulan["Kategori"] = df_bulan["Kategori"].astype(frequency.KATEGORI_DTYPE)
+        data_per_pelanggan.append(df_bulan)
+    hasil = pd.concat(data_per_pelanggan, ignore_index=True).sort_values(by=["Bulan", "Kategori"], kind="stable")
+    return pd.DataFrame(kuartil_list), hasil
+
+
+def _monthly_sales(seed=0, rows=600):
+    rng = np.random.default_rng(seed)
+    bulan = rng.choice(["Februari 2024", "Januari 2024", "Maret 2024"], rows)
+    return pd.DataFrame({"Bulan": bulan, "ID Customer": rng.zipf(1.5, rows) % 40,
+                         "Tanggal": pd.Timestamp(2024, 1, 1) + pd.to_timedelta(rng.integers(0, 90, rows), unit="D"),
+                         "Nama": "Pelanggan", "Total Penjualan": rng.integers(1, 100, rows) * 5000})
+
+
+def test_categorize_frequency_matches_legacy():
+    transaksi = frequency.transactions_per_month(_monthly_sales())
+    df_kuartil, hasil = frequency.categorize_frequency(transaksi)
+    expected_kuartil, expected = legacy_categorize_frequency(transaksi)
+    pd.testing.assert_frame_equal(df_kuartil, expected_kuartil.sort_values("Bulan", ignore_index=True),
+                                  check_dtype=False)
+    assert list(hasil.index) == list(expected.index)
+    assert list(hasil["Kategori"]) == list(expected["Kategori"])
+
+
+# Implementasi lama Pareto (cumsum lalu perbandingan per baris) sebagai acuan
+def legacy_pareto(df, threshold=80):
+    grouped_df = df.groupby("ID Customer")["Total Penjualan"].sum().reset_index()
+    grouped_df = grouped_df.sort_values(by="Total Penjualan", ascending=False)
+    grouped_df["Cumulative Percentage"] = grouped_df["Total Penjualan"].cumsum() / grouped_df["Total Penjualan"].sum() * 100
+    grouped_df[f"Above {threshold}%"] = grouped_df["Cumulative Percentage"] <= threshold
+    return grouped_df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("threshold", [50, 80, 95])
+def test_pareto_matches_legacy(threshold):
+    df = _monthly_sales(seed=1)
+    df["Total Penjualan"] += df["ID Customer"]  # total per customer dibuat unik agar urutannya pasti
+    hasil = pareto.pareto(df, threshold=threshold)
+    expected = legacy_pareto(df, threshold)
+    for col in ["ID Customer", "Total Penjualan", f"Above {threshold}%"]:
+        assert list(hasil.customers[col]) == list(expected[col]), col
+    np.testing.assert_allclose(hasil.customers["Cumulative Percentage"], expected["Cumulative Percentage"])
+    assert hasil.jumlah_customer_top == expected[f"Above {threshold}%"].sum()
+
+
+def test_pareto_threshold_reached_exactly():
+    df = pd.DataFrame({"ID Customer": ["a", "b", "c", "d"], "Nama": ["A", "B", "C", "D"],
+                       "Total Penjualan": [50, 30, 15, 5]})
+    hasil = pareto.pareto(df)
+    assert list(hasil.customers["Above 80%"]) == [True, True, False, False]
+    assert hasil.penjualan_top == 80
+
+
+def _member_case(categorical):
+    sales = pd.DataFrame({"ID Customer": ["C1", "C2", "C1", "C4", "C5", None],
+                          "Terdaftar di form": [1, 0, 1, 1, 0, 1]})
+    pelanggan = members.normalize_members(pd.DataFrame({"id customer": ["C1", "C2", "C3", "C4", "C3"]}))
+    if categorical:
+        sales["ID Customer"] = sales["ID Customer"].astype("category")
+        pelanggan["ID Customer"] = pelanggan["ID Customer"].astype("category")
+    return sales, pelanggan
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_non_transacting_matches_isin(categorical):
+    sales, pelanggan = _member_case(categorical)
+    _, no_transactions = members.non_transacting(sales, pelanggan)
+    # cara lama: ID pelanggan terdaftar yang punya transaksi bertanda terdaftar
+    terdaftar = sales.loc[sales["Terdaftar di form"] == 1, "ID Customer"]
+    expected = pelanggan[~pelanggan["ID Customer"].isin(terdaftar)]
+    assert list(no_transactions.index) == list(expected.index)
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_customer_totals_from_member_index(categorical):
+    sales, pelanggan = _member_case(categorical)
+    index = members.member_index(pelanggan)
+    assert members.customer_totals(sales["ID Customer"], index) == {"terdaftar": 4, "tidak_terdaftar": 1}
+    assert members.customer_totals_by_flag(sales["ID Customer"], sales["Terdaftar di form"] == 1) == \
+        {"terdaftar": 2, "tidak_terdaftar": 2}
+
+
+def test_validation_report_flags_rows_and_blocks_analyses():
+    df = apply_schema(pd.DataFrame({
+        "ID Customer": ["C1", None, "C3"], "Nama": ["A", "B", "C"], "Tanggal": ["2024-01-02", "besok", "2024-01-05"],
+        "Total Penjualan": [1000, 2000, None], "Terdaftar di form": [0, 1, 2], "Reseller": [0, 1, 0]}))
+    report = validation.validate(df)
+    masalah = report.issues.set_index(["Kolom", "Masalah"])
+    assert masalah.loc[("Tanggal", "Tanggal tidak bisa dibaca"), "Tingkat"] == "error"
+    assert masalah.loc[("ID Customer", "ID kosong"), "Contoh Baris Excel"] == "3"
+    assert masalah.loc[("Terdaftar di form", "Nilai selain 0/1"), "Contoh Baris Excel"] == "4"
+    assert report.unusable == ["Tanggal"]
+    assert report.usable("pareto") and not report.usable("rfm")
+    assert list(validation.invalid_rows(df, report)["Baris Excel"]) == [3, 4]
+
+    # Kolom yang tidak ada di salah satu sheet tidak bisa dipakai untuk gabungannya
+    lain = validation.validate(apply_schema(pd.DataFrame({"ID Customer": ["C9"], "Nama": ["Z"],
+                                                          "Total Penjualan": [500]})))
+    gabungan = validation.combine({"Januari": report, "Februari": lain})
+    assert gabungan.missing("frekuensi") == ["Terdaftar di form"]
+    assert gabungan.rows == 4
+
+    # Laporan yang disimpan (aggregate_store) tidak membawa posisi baris, hanya contohnya
+    tersimpan = validation.ValidationReport.from_dict(report.to_dict())
+    pd.testing.assert_frame_equal(tersimpan.issues, report.issues, check_dtype=False)
+    assert len(tersimpan.error_rows()) == 0
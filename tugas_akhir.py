@@ -1,66 +1,209 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from io import StringIO
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-
-
-# Fungsi untuk menampilkan informasi dasar dan statistik deskriptif
-def informasi_dasar(data_penjualan, sheet_name):
-    df = pd.read_excel(data_penjualan, sheet_name=sheet_name)
-
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from analitik import aggregate_store
+from analitik import charts
+from analitik import disk_cache
+from analitik import frequency
+from analitik import loader
+from analitik import memo
+from analitik import members
+from analitik import pareto
+from analitik import profiler
+from analitik import rfm as rfm_module
+from analitik import sales
+from analitik import shared_cache
+from analitik import streaming
+from analitik import tables
+from analitik import timeseries
+from analitik import validation
+
+
+# Fungsi untuk menampilkan informasi dasar dan statistik deskriptif.
+# Setiap bagian dihitung lewat memo.section: rerun dengan DataFrame dan parameter
+# yang sama (mis. saat hanya mengetik periode) memakai hasil sebelumnya.
+def informasi_dasar(df):
+    with profiler.stage("informasi_dasar", rows_in=len(df)):
+        info = memo.section("informasi_dasar", sales.basic_info, df)
     # Informasi dasar
     st.markdown("### 📄 Informasi Dasar")
     st.write("Data Sample:")
-    st.dataframe(df.head())  
-    
-    # Menampilkan struktur data menggunakan buffer untuk info
-    st.markdown("#### Struktur Data")
-    buffer = StringIO()  # Membuat buffer untuk menampung output
-    df.info(buf=buffer)  # Menyimpan info ke buffer
-    st.text(buffer.getvalue())  # Menampilkan isi buffer
+    st.dataframe(info["sample"])
 
-    # Konversi tipe data ke kategori jika kolom tersedia
-    cols = ['Terdaftar di form', 'Reseller']
-    if set(cols).issubset(df.columns):
-        df[cols] = df[cols].astype('category')
+    # Menampilkan struktur data (output df.info)
+    st.markdown("#### Struktur Data")
+    st.text(info["info"])
+    # Memori yang dihemat oleh skema tipe data saat file dimuat. Pada data kecil tipe
+    # kategori bisa lebih besar dari aslinya, jadi persentase hemat hanya ditampilkan jika positif
+    if info["memory_before"]:
+        sebelum, sesudah = info["memory_before"], info["memory_after"]
+        hemat = f" (hemat {(1 - sesudah / sebelum) * 100:.1f}%)" if sesudah < sebelum else ""
+        st.caption(f"Memori data: {sebelum / 1024**2:,.2f} MB → {sesudah / 1024**2:,.2f} MB{hemat}")
 
     # Pemisah garis
     st.markdown("---")
 
     # Statistik deskriptif
     st.markdown("### 📊 Statistik Deskriptif")
-    st.dataframe(df.describe())
+    st.dataframe(info["describe"])
+
+    st.markdown("---")
+    st.markdown("#### 📊 Distribusi Penjualan")
+    with profiler.stage("penjualan_harian", rows_in=len(df)) as s:
+        deret = memo.section("deret_penjualan", timeseries.SalesSeries.from_rows, df)
+        s.rows_out = len(deret)
+    grafik_tren(deret, "tren")
+
+# Fungsi untuk menampilkan grafik tren penjualan dengan granularitas yang bisa dipilih.
+# Deret harian dibuat sekali; tampilan mingguan, bulanan, per hari dalam minggu, dan
+# rata-rata bergerak diturunkan dari deret harian tersebut.
+def grafik_tren(deret, key):
+    if len(deret) == 0:
+        st.warning("Kolom 'Tanggal' tidak ditemukan atau tidak berisi tanggal yang valid.")
+        return
+    col1, col2, col3 = st.columns(3)
+    granularitas = col1.selectbox("Granularitas", timeseries.GRANULARITIES,
+                                  index=timeseries.GRANULARITIES.index(deret.default_granularity()),
+                                  key=f"{key}_granularitas")
+    kolom = col2.selectbox("Nilai", deret.columns, key=f"{key}_kolom")
+    rata_rata = col3.selectbox("Rata-rata bergerak", [0, 3, 7, 14, 30],
+                               format_func=lambda n: "Tidak ada" if n == 0 else f"{n} periode",
+                               disabled=granularitas == "Hari dalam minggu", key=f"{key}_rata_rata")
+    with profiler.stage("tren_penjualan", rows_in=len(deret)) as s:
+        tampilan = deret.view(granularitas, kolom, rata_rata)
+        s.rows_out = len(tampilan)
+    tampilkan_grafik("series", tampilan, title=f"{kolom} ({granularitas.lower()})")
+    if granularitas == "Hari dalam minggu":
+        st.caption("Rata-rata per hari untuk setiap hari dalam minggu.")
+    elif granularitas != "Harian":
+        st.caption("Periode pertama dan terakhir bisa tidak penuh (data tidak mulai/berakhir di awal/akhir periode).")
+
+# Fungsi untuk menampilkan grafik dari data agregat. Backend matplotlib memakai
+# gambar yang di-cache per isi data; backend interaktif memakai Vega-Lite.
+def tampilkan_grafik(kind, data, **params):
+    with profiler.stage(f"grafik_{kind}", rows_in=len(data)):
+        if backend_grafik == "Interaktif (Vega-Lite)":
+            chart_data, spec = memo.section("grafik_vega", charts.vega_spec, kind, data, **params)
+            st.vega_lite_chart(chart_data, spec, use_container_width=True)
+        else:
+            st.image(memo.section("grafik_gambar", charts.render, kind, data, **params))
+
+# Fungsi untuk menampilkan laporan validasi yang dibuat sekali saat sheet dimuat.
+# Jika DataFrame sheet diberikan, baris yang bermasalah juga ditampilkan; laporan dari
+# penyimpanan agregat hanya berisi contoh nomor baris Excel.
+def tampilkan_validasi(laporan, key, judul="data", df=None):
+    if laporan.ok:
+        st.caption(f"✅ Validasi {judul}: {laporan.rows:,} baris tanpa masalah.")
+        return
+    ada_error = bool((laporan.issues["Tingkat"] == "error").any())
+    with st.expander(f"⚠️ Laporan validasi {judul}", expanded=ada_error):
+        st.dataframe(laporan.issues, hide_index=True)
+        if laporan.unusable:
+            st.error(f"Tipe data kolom {', '.join(laporan.unusable)} tidak sesuai, analisis yang membutuhkannya dilewati.")
+        if df is not None and len(laporan.error_rows()):
+            st.markdown("Baris yang bermasalah:")
+            baris = memo.section((key, id(laporan)), lambda data: validation.invalid_rows(data, laporan), df)
+            tabel_halaman(baris, key, file_name="baris_bermasalah")
+        elif df is None:
+            st.caption("Daftar lengkap baris yang bermasalah bisa dilihat per sheet di 📊 Analisis Data Penjualan.")
+
+# Fungsi untuk memeriksa kolom yang dibutuhkan sebuah analisis dari laporan validasi
+def kolom_tersedia(laporan, analisis, nama):
+    kurang = laporan.missing(analisis)
+    if kurang:
+        st.warning(f"{nama} tidak bisa dijalankan: kolom {', '.join(kurang)} tidak ada atau tipe datanya tidak sesuai.")
+    return not kurang
+
+# Fungsi untuk menampilkan tabel hasil yang besar per halaman. Pengurutan dan pencarian
+# dikerjakan di server (urutan per kolom disimpan di TableView), jadi hanya baris pada
+# halaman yang dipilih yang dikirim ke browser. Ekspor berisi seluruh data.
+def tabel_halaman(df, key, sort_by=None, ascending=True, file_name="data"):
+    view = memo.section("tabel", tables.TableView, df)
+    kolom = list(view.df.columns)
+    if len(view) > tables.PAGE_SIZES[0]:
+        col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+        pilihan_urut = ["(urutan asli)"] + kolom
+        urut = col1.selectbox("Urutkan berdasarkan", pilihan_urut,
+                              index=pilihan_urut.index(sort_by) if sort_by in kolom else 0, key=f"{key}_urut")
+        arah = col2.selectbox("Arah", ["Naik", "Turun"], index=0 if ascending else 1, key=f"{key}_arah")
+        kolom_cari = col3.selectbox("Cari di kolom", kolom, key=f"{key}_kolom_cari")
+        teks_cari = col4.text_input("Kata kunci", key=f"{key}_cari")
+        query = dict(sort_by=urut if urut in kolom else None, ascending=arah == "Naik",
+                     filter_column=kolom_cari, filter_text=teks_cari.strip())
+        col1, col2 = st.columns([1, 1])
+        ukuran = col1.selectbox("Baris per halaman", tables.PAGE_SIZES, key=f"{key}_ukuran")
+        jumlah = len(view.positions(**query))
+        jumlah_halaman = max(1, -(-jumlah // ukuran))
+        halaman = col2.number_input(f"Halaman (dari {jumlah_halaman:,})", min_value=1, max_value=jumlah_halaman,
+                                    value=1, step=1, key=f"{key}_halaman")
+        data, jumlah = view.page(min(int(halaman), jumlah_halaman), ukuran, **query)
+        awal = (min(int(halaman), jumlah_halaman) - 1) * ukuran
+        st.dataframe(data, hide_index=True)
+        st.caption(f"Baris {min(awal + 1, jumlah):,}–{awal + len(data):,} dari {jumlah:,}"
+                   + (f" (disaring dari {len(view):,})" if jumlah != len(view) else ""))
+    else:
+        st.dataframe(view.df, hide_index=True)
+    col1, col2 = st.columns([1, 1])
+    # Data ekspor baru dibuat saat tombol diklik
+    col1.download_button("⬇️ Unduh CSV", lambda: tables.to_csv_bytes(view.df), file_name=f"{file_name}.csv",
+                         mime="text/csv", key=f"{key}_csv")
+    if tables.parquet_available():
+        col2.download_button("⬇️ Unduh Parquet", lambda: tables.to_parquet_bytes(view.df), file_name=f"{file_name}.parquet",
+                             mime="application/octet-stream", key=f"{key}_parquet")
+
+# Fungsi untuk ringkasan sheet yang sangat besar: sheet dibaca per chunk dan
+# hanya hasil agregasinya yang disimpan di memori
+def ringkasan_streaming(data_penjualan, sheet_name, periode):
+    with profiler.stage("ringkasan_streaming") as s:
+        summary = streaming.summarize_sheet(data_penjualan, sheet_name)
+        if summary.missing:
+            # hanya judul kolom yang dibaca, sama seperti kolom_tersedia di mode biasa
+            st.warning(f"Mode streaming tidak bisa dijalankan: kolom {', '.join(summary.missing)} tidak ada di sheet {sheet_name}.")
+            return
+        per_customer = memo.section(("per_customer", loader.file_hash(data_penjualan), sheet_name), summary.per_customer)
+        s.rows_out = len(per_customer)
+
+    st.markdown("### 📄 Informasi Dasar (Mode Streaming)")
+    st.write(f"- Jumlah baris: {summary.rows:,} (dibaca dalam {summary.chunks} chunk)")
+    if not summary.terdaftar_counts.empty:
+        modus_terdaftar = summary.terdaftar_counts.idxmax()
+        if modus_terdaftar == 0:
+            st.write(f"- Mayoritas transaksi berasal dari pelanggan tidak terdaftar ({modus_terdaftar})")
+        elif modus_terdaftar == 1:
+            st.write(f"- Mayoritas transaksi berasal dari pelanggan terdaftar ({modus_terdaftar})")
+    jumlah_customer = len(per_customer)
+    st.write(f"- Jumlah customer pada {periode}: {jumlah_customer}")
+    st.write(f"- Total penjualan pada {periode}: {summary.total_penjualan:,.0f}")
+    if jumlah_customer > 0:
+        st.write(f"- Rata-rata penjualan per orang pada {periode}: {summary.total_penjualan / jumlah_customer:,.2f}")
+    rata_rata_reseller = summary.reseller_total / summary.reseller_count if summary.reseller_count > 0 else 0
+    st.write(f"- Total penjualan reseller pada {periode}: {summary.reseller_total:,.0f}")
+    st.write(f"- Jumlah transaksi reseller pada {periode}: {summary.reseller_count}")
+    st.write(f"- Rata-rata penjualan reseller pada {periode}: {rata_rata_reseller:,.0f}")
 
     st.markdown("---")
-    st.markdown("#### 📊 Distribusi Total Penjualan per Tanggal")
-
-    df_grouped = df.groupby("Tanggal", as_index=False)["Total Penjualan"].sum()
-    date_range = pd.date_range(start=df_grouped["Tanggal"].min(), end=df_grouped["Tanggal"].max())#Membuat rentang tanggal lengkap dari awal hingga akhir bulan
-    df_grouped = df_grouped.set_index("Tanggal").reindex(date_range, fill_value=0).reset_index()#tanggal yang tidak ada diisi dengan 0
-    df_grouped.rename(columns={"index": "Tanggal"}, inplace=True)
-    # Plot grafik batang
-    fig, ax = plt.subplots(figsize=(15, 7.5))
-    ax.bar(df_grouped["Tanggal"], df_grouped["Total Penjualan"], color="royalblue", align="center")
-    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x):,}'))
-    ax.set_xticks(df_grouped["Tanggal"])
-    ax.set_xticklabels(df_grouped["Tanggal"].dt.strftime("%Y-%m-%d"), rotation=45, ha="right")
-    ax.set_xlabel("Tanggal")
-    ax.set_ylabel("Total Penjualan")
-    ax.set_title(f"Distribusi Total Penjualan per Tanggal")
-    ax.grid(axis="y", linestyle="--", alpha=0.7)
-    st.pyplot(fig)
+    st.markdown("#### 📊 Distribusi Penjualan")
+    deret = memo.section(("deret_streaming", loader.file_hash(data_penjualan), sheet_name),
+                         lambda: timeseries.SalesSeries.from_totals(summary.per_tanggal()))
+    grafik_tren(deret, "tren_streaming")
 
-# Fungsi untuk analisis lanjutan
-def analisis_lanjutan(data_penjualan, sheet_name, periode):
-    df = pd.read_excel(data_penjualan, sheet_name=sheet_name)
+    st.markdown("#### Total Penjualan per Customer")
+    tabel_halaman(per_customer, "streaming_customer", sort_by="Total Penjualan", ascending=False,
+                  file_name="total_penjualan_per_customer")
+
+    with st.expander("💾 Pemakaian memori"):
+        st.json(summary.memory_report())
 
+# Fungsi untuk analisis lanjutan
+def analisis_lanjutan(df, periode):
     st.markdown(f"### 🔍 Analisis Lanjutan untuk {periode}")
-    
+    with profiler.stage("analisis_lanjutan", rows_in=len(df)):
+        metrics = memo.section("analisis_lanjutan", sales.advanced_metrics, df)
+
     # Modus pelanggan terdaftar
-    if 'Terdaftar di form' in df.columns:
-        modus_terdaftar = df['Terdaftar di form'].mode()[0]  # Modus
+    if "modus_terdaftar" in metrics:
+        modus_terdaftar = metrics["modus_terdaftar"]
         if modus_terdaftar == 0:
             status_pelanggan = "Mayoritas transaksi berasal dari pelanggan tidak terdaftar"
         elif modus_terdaftar == 1:
@@ -68,112 +211,61 @@ def analisis_lanjutan(data_penjualan, sheet_name, periode):
         st.write(f"- {status_pelanggan} ({modus_terdaftar})")
 
     # Rata-rata transaksi per orang
-    if 'ID Customer' in df.columns and 'Total Penjualan' in df.columns:
-        unique_customers = df.drop_duplicates(subset=['ID Customer'])
-        jumlah_customer = len(unique_customers)
-        total_transaksi = df['Total Penjualan'].sum()
-        rata_rata_transaksi = total_transaksi / jumlah_customer
-
-        st.write(f"- Jumlah customer pada {periode}: {jumlah_customer}")
-        st.write(f"- Total penjualan pada {periode}: {total_transaksi:,.0f}")
-        st.write(f"- Rata-rata penjualan per orang pada {periode}: {rata_rata_transaksi:,.2f}")
+    if "jumlah_customer" in metrics:
+        st.write(f"- Jumlah customer pada {periode}: {metrics['jumlah_customer']}")
+        st.write(f"- Total penjualan pada {periode}: {metrics['total_penjualan']:,.0f}")
+        st.write(f"- Rata-rata penjualan per orang pada {periode}: {metrics['rata_rata_per_customer']:,.2f}")
 
     # Analisis transaksi reseller
-    if 'Reseller' in df.columns and 'Total Penjualan' in df.columns:
-        transaksi_reseller = df[df['Reseller'] == 1]['Total Penjualan']
-        total_transaksi_reseller = transaksi_reseller.sum()
-        jumlah_transaksi_reseller = len(transaksi_reseller)
-        rata_rata_reseller = total_transaksi_reseller / jumlah_transaksi_reseller if jumlah_transaksi_reseller > 0 else 0
-
-        st.write(f"- Total penjualan reseller pada {periode}: {total_transaksi_reseller:,.0f}")
-        st.write(f"- Jumlah transaksi reseller pada {periode}: {jumlah_transaksi_reseller}")
-        st.write(f"- Rata-rata penjualan reseller pada {periode}: {rata_rata_reseller:,.0f}")
+    if "jumlah_transaksi_reseller" in metrics:
+        st.write(f"- Total penjualan reseller pada {periode}: {metrics['total_penjualan_reseller']:,.0f}")
+        st.write(f"- Jumlah transaksi reseller pada {periode}: {metrics['jumlah_transaksi_reseller']}")
+        st.write(f"- Rata-rata penjualan reseller pada {periode}: {metrics['rata_rata_reseller']:,.0f}")
 
     st.markdown("---")
 
-# Fungsi untuk menghitung koefisien variasi (CV)
-def calculate_cv(data_penjualan, sheet_name, column_name):
-    df = pd.read_excel(data_penjualan, sheet_name=sheet_name)
-
-    mean = np.mean(df[column_name])
-    std_dev = np.std(df[column_name], ddof=0)
-
-    if mean == 0:
-        return None, "Mean is zero, CV cannot be calculated."
-
-    cv = (std_dev / mean) * 100
-
-    if cv < 10:
-        assessment = "Variasi kecil (Data sangat homogen dan tidak banyak berubah.)"
-    elif 10 <= cv <= 20:
-        assessment = "Variasi sedang (Data cukup bervariasi tetapi masih dapat dianggap relatif stabil.)"
-    else:
-        assessment = "Variasi besar (Data memiliki fluktuasi yang tinggi dan tidak stabil.)"
-
-    return cv, assessment
+# Fungsi untuk memisahkan tabel RFM per kategori (urut sesuai daftar segmen)
+def per_kategori(rfm):
+    return {category: data for category, data in rfm.groupby("Kategori", observed=False)}
 
    # Fungsi untuk analisis Pareto
-def pareto_analysis (data_penjualan, sheet_name, periode, jumlah_customer_tidak_terdaftar, jumlah_customer_terdaftar) :
+# Jika jumlah customer terdaftar/tidak terdaftar None, total customer = customer di sheet ini,
+# sehingga persentase customer aktif (selalu 100%) tidak ditampilkan
+def pareto_analysis (df, periode, jumlah_customer_tidak_terdaftar, jumlah_customer_terdaftar, threshold=80, top_n=30) :
     st.markdown('### Analisis pareto')
-    df = pd.read_excel(data_penjualan, sheet_name=sheet_name)
-    total_customer = int(jumlah_customer_tidak_terdaftar) + int(jumlah_customer_terdaftar)
-    st.write(f"- Total Customer : {total_customer}")
-    unique_customers = df.drop_duplicates(subset=['ID Customer'])
-    jumlah_customer = len(unique_customers)
-    presentase_customer = (jumlah_customer / total_customer) * 100
-    st.write(f"- Presentase Customer yang aktif pada {periode} : {presentase_customer:.2f}% (dari total customer)")
-    total_transaksi_rapih = f"{df['Total Penjualan'].sum():,}".replace(",", ".")
-    st.write(f"- Yang artinya total penjualan pada {periode} : {total_transaksi_rapih} berasal dari {presentase_customer:.2f}% customer")
+    with profiler.stage("pareto", rows_in=len(df)) as s:
+        hasil = memo.section("pareto", pareto.pareto, df, threshold=threshold, top_n=top_n)  # satu kali agregasi untuk teks, tabel, dan grafik
+        s.rows_out = hasil.jumlah_customer
+
+    if jumlah_customer_terdaftar is None:
+        total_customer = hasil.jumlah_customer
+        st.write(f"- Total Customer pada {periode} : {total_customer}")
+    else:
+        total_customer = jumlah_customer_tidak_terdaftar + jumlah_customer_terdaftar
+        st.write(f"- Total Customer : {total_customer}")
+        presentase_customer = (hasil.jumlah_customer / total_customer) * 100
+        st.write(f"- Presentase Customer yang aktif pada {periode} : {presentase_customer:.2f}% (dari total customer)")
+        total_transaksi_rapih = f"{hasil.total_penjualan:,}".replace(",", ".")
+        st.write(f"- Yang artinya total penjualan pada {periode} : {total_transaksi_rapih} berasal dari {presentase_customer:.2f}% customer")
 
     # Pareto chart
-    st.markdown("#### 📊 Pareto Chart (80/20)")
-    st.markdown('(Grafik di bawah ini hanya menampilkan 30 top customer.)')
-    if 'ID Customer' not in df.columns or 'Total Penjualan' not in df.columns:
-        st.warning("Kolom 'ID Customer' atau 'Total Penjualan' tidak ditemukan di dataset.")
-        return
+    st.markdown(f"#### 📊 Pareto Chart ({threshold:g}/{100 - threshold:g})")
+    st.markdown(f'(Grafik di bawah ini hanya menampilkan {top_n} top customer.)')
 
-    grouped_df = df.drop(columns=["Tanggal","Terdaftar di form", "Reseller"]).groupby('ID Customer')['Total Penjualan'].sum().reset_index()
-    grouped_df = grouped_df.sort_values(by='Total Penjualan', ascending=False)
-    grouped_df['Cumulative Percentage'] = grouped_df['Total Penjualan'].cumsum() / grouped_df['Total Penjualan'].sum() * 100
-    grouped_df["Above 80%"] = grouped_df["Cumulative Percentage"] <= 80
-
-    plt.rcParams.update({'font.size': 7})
-    fig, ax = plt.subplots(figsize=(10, 6))
-    plt.xticks(rotation=45, ha="right")
-    ax.margins(x=0.06)  # Beri ruang di sumbu X
-    ax.bar(grouped_df['ID Customer'], grouped_df['Total Penjualan'], color=np.where(grouped_df["Above 80%"], "lightcoral", "skyblue"))
-    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x):,}'))
-    ax2 = ax.twinx()
-    ax2.plot(grouped_df['ID Customer'], grouped_df['Cumulative Percentage'], color='orange', marker='o', linestyle='-')
-    ax2.axhline(80, color='red', linestyle='--', linewidth=1)
-    ax2.text(len(ax.set_xlim(5, 29)) - 1, 82, "80% Threshold", color="red", fontsize=10, ha="left")
-
-    ax.set_xlim(-1, 30)  # Hanya tampilkan 30 pelanggan pertama
-    ax.set_title("Pareto Analysis : Customers Contributing to 80% of Sales")
-    ax.set_xlabel("ID Customer")
-    ax.set_ylabel("Total Penjualan")
-    ax2.set_ylabel("Cumulative Percentage (%)")
-    st.pyplot(fig)
+    # Hanya N customer teratas yang digambar
+    tampilkan_grafik("pareto", hasil.chart_data, threshold=threshold, top_n=top_n)
 
     # Menampilkan data
     st.markdown("#### Hasil Analisis")
-    top_80 = grouped_df[grouped_df['Cumulative Percentage'] <= 80]
-    presentase_customer = (len(top_80) / total_customer)* 100
-    st.write(f"- 80% dari total penjualan : {top_80['Total Penjualan'].sum():,.2f}")
-    st.write(f"- Jumlah customer yang menyumbang 80% penjualan : {len(top_80)}")
-    st.write(f"- Persentase customer yang menyumbang 80% penjualan : {presentase_customer:.2f}%")
-    st.write(f"- Persentase transaksi yang menyumbang 80% penjualan : {((len(top_80) / df['Total Penjualan'].count()) * 100):.2f}%")
+    presentase_customer = (hasil.jumlah_customer_top / total_customer)* 100
+    st.write(f"- {threshold:g}% dari total penjualan : {hasil.penjualan_top:,.2f}")
+    st.write(f"- Jumlah customer yang menyumbang {threshold:g}% penjualan : {hasil.jumlah_customer_top}")
+    st.write(f"- Persentase customer yang menyumbang {threshold:g}% penjualan : {presentase_customer:.2f}%")
+    st.write(f"- Persentase transaksi yang menyumbang {threshold:g}% penjualan : {((hasil.jumlah_customer_top / hasil.jumlah_transaksi) * 100):.2f}%")
     st.markdown('\n')
-    st.markdown('Daftar Nama customer yang menyumbang 80% penjualan :')
-    #Menampilkan dataframe yang hanya berisi dengan customer yang menyumbang 80% penjualan
-    df_sorted = df.groupby('ID Customer').agg({
-    'Nama' : 'first',
-    'Total Penjualan': 'sum',  
-    }).reset_index().sort_values(by='Total Penjualan', ascending=False)
-    df_sorted_rename = df_sorted.rename(columns={'Total Penjualan': 'Total Penjualan df'}) 
-    top_customers = pd.merge(df_sorted_rename, grouped_df[grouped_df['Cumulative Percentage'] <= 80], on='ID Customer', how='inner')
-    top_customers = top_customers.drop(columns=['Total Penjualan df'])
-    st.dataframe(top_customers)
+    st.markdown(f'Daftar Nama customer yang menyumbang {threshold:g}% penjualan :')
+    #Menampilkan dataframe yang hanya berisi dengan customer yang menyumbang threshold% penjualan
+    tabel_halaman(hasil.top_customers, "pareto_top", file_name="pareto_top_customer")
 
 
 
@@ -196,6 +288,25 @@ st.write(f'''
              ''')
 st.text('Nama kolom harus sama persis seperti di atas.')
 st.markdown("---")
+# Cache data: sheet yang pernah diunggah disimpan dalam format Feather agar tidak dibaca ulang dari Excel
+backend_grafik = st.sidebar.radio("Backend grafik", ["Gambar (matplotlib)", "Interaktif (Vega-Lite)"])
+if st.sidebar.button("🗑️ Hapus cache data"):
+    loader.clear_cache(disk=True)
+    memo.clear()
+    shared_cache.clear()  # ringkasan streaming, laporan validasi, dan entri lain di cache bersama
+    charts.clear_cache()
+    members.clear_cache()
+    aggregate_store.clear()
+    st.sidebar.success("Cache data sudah dihapus.")
+# Sheet dan hasil analisis disimpan di cache bersama untuk semua sesi; sesi ini memegang
+# referensi ke entri yang dipakainya sampai rerun berikutnya agar tidak dibuang. Referensi
+# sesi yang browsernya sudah ditutup dilepas pada rerun sesi mana pun berikutnya.
+ctx = get_script_run_ctx()
+shared_cache.begin(ctx.session_id if ctx else None,
+                   active=runtime.get_instance().is_active_session if runtime.exists() else None)
+# Instrumentasi per tahap (waktu, CPU, memori, jumlah baris); hasilnya ditampilkan di akhir skrip
+profiler.enable(st.sidebar.checkbox("⏱️ Tampilkan panel performa", value=profiler.DEFAULT_ENABLED))
+profiler.reset()
 pilihan = st.selectbox('Apa yang ingin Anda lakukan?',['📊 Analisis Data Penjualan','🔍 Analisis Perilaku Pelanggan', '👥 Segmentasi RFM'])
 
 #Analisis Data Penjualan
@@ -213,40 +324,78 @@ if pilihan == '📊 Analisis Data Penjualan' :
        - Analisis Reseller: Mengevaluasi transaksi yang dilakukan oleh reseller, termasuk total penjualan dan rata-rata transaksi.
     3. Koefisien Variasi (CV):
        - Mengukur tingkat variasi dalam penjualan menggunakan Koefisien Variasi, untuk menilai seberapa stabil performa penjualan dari waktu ke waktu.
+       - CV dihitung untuk semua kolom numerik per transaksi, harian, mingguan, rolling 7 hari, dan per bulan.
     4. Analisis Pareto
     ''')
     st.markdown("---")
     uploaded_file = st.file_uploader("**Silahkan unggah file excel di bawah ini 📥 :**", type=["xlsx"])
     # Jika file di-upload
     if uploaded_file:
-        excel_file = pd.ExcelFile(uploaded_file)
-        sheet_names = excel_file.sheet_names
+        sheet_names = loader.sheet_names(uploaded_file)
         sheet_name = st.selectbox("Pilih Sheet:", sheet_names, index=0)
-    
+        mode_streaming = st.checkbox("Mode streaming (untuk file yang sangat besar)")
+        if mode_streaming:
+            st.markdown("---")
+            periode = st.text_input("Masukkan periode analisis (contoh: Januari 2024):", "Januari 2024")
+            ringkasan_streaming(uploaded_file, sheet_name, periode)
+        else:
+            with profiler.stage("muat_sheet") as s:
+                df = loader.load_sheet(uploaded_file, sheet_name) # dibaca sekali, dipakai semua analisis
+                laporan = loader.validation_report(uploaded_file, sheet_name) # dibuat saat sheet diparsing
+                s.rows_out = len(df)
+            tampilkan_validasi(laporan, "validasi", judul=f"sheet {sheet_name}", df=df)
 
-        st.markdown("---")
-        informasi_dasar(uploaded_file, sheet_name) # informasi dasar
-        # Menjalankan analisis lanjutan
-        periode = st.text_input("Masukkan periode analisis (contoh: Januari 2024):", "Januari 2024")
-        if st.button("Jalankan Analisis Lanjutan"):
-             analisis_lanjutan(uploaded_file, sheet_name, periode)
-
-        # Menjalankan fitur CV
-        st.markdown("### 📉 Koefisien Variasi (CV)")
-        column_name = st.selectbox("Pilih Kolom untuk Analisis CV:", pd.read_excel(uploaded_file, sheet_name=sheet_name).columns)
-        if st.button("Hitung CV"):
-            cv, assessment = calculate_cv(uploaded_file, sheet_name, column_name)
-            if cv is not None:
-                st.success(f"Koefisien Variasi: {cv:.2f}%")
-                st.info(assessment)
-            else:
-                st.error(assessment)
-        st.markdown("---")
+            st.markdown("---")
+            informasi_dasar(df) # informasi dasar
+            # Menjalankan analisis lanjutan
+            periode = st.text_input("Masukkan periode analisis (contoh: Januari 2024):", "Januari 2024")
+            if st.button("Jalankan Analisis Lanjutan"):
+                 analisis_lanjutan(df, periode)
+
+            # Menjalankan fitur CV
+            st.markdown("### 📉 Koefisien Variasi (CV)")
+            # CV semua kolom numerik & jendela waktu dihitung sekaligus; pilihan hanya membaca tabel
+            with profiler.stage("cv", rows_in=len(df)) as s:
+                tabel_cv = memo.section("cv", sales.cv_table, df)
+                s.rows_out = len(tabel_cv)
+            column_name = st.selectbox("Pilih Kolom untuk Analisis CV:", tabel_cv["Kolom"].unique())
+            jendela = st.selectbox("Pilih jendela waktu:", sales.CV_WINDOWS,
+                                   help="Selain 'Per transaksi', nilai kolom dijumlahkan per jendela waktu lalu dihitung CV-nya.")
+            if st.button("Hitung CV"):
+                hasil_cv = tabel_cv[(tabel_cv["Kolom"] == column_name) & (tabel_cv["Jendela"] == jendela)]
+                if hasil_cv.empty:
+                    st.error("CV untuk jendela waktu ini tidak tersedia (kolom Tanggal tidak valid).")
+                elif pd.notna(hasil_cv["CV"].iloc[0]):
+                    st.success(f"Koefisien Variasi: {hasil_cv['CV'].iloc[0]:.2f}%")
+                    st.info(hasil_cv["Penilaian"].iloc[0])
+                else:
+                    st.error(hasil_cv["Penilaian"].iloc[0])
+            with st.expander("Tabel CV semua kolom dan jendela waktu"):
+                st.dataframe(tabel_cv, hide_index=True)
+            st.markdown("---")
 
-        jumlah_customer_tidak_terdaftar = st.text_input("Masukkan jumlah customer tidak terdaftar", "117")
-        jumlah_customer_terdaftar = st.text_input("Masukkan jumlah customer terdaftar", "177")
-        if st.button('Jalankan analisis Pareto') :
-            pareto_analysis (uploaded_file, sheet_name, periode, jumlah_customer_tidak_terdaftar, jumlah_customer_terdaftar)
+            threshold = st.slider("Batas kontribusi penjualan Pareto (%)", 50, 95, 80, step=5)
+            top_n = st.number_input("Jumlah top customer di grafik Pareto", min_value=5, max_value=200, value=30, step=5)
+            sheet_total = st.multiselect("Sheet untuk menghitung total customer:", sheet_names, default=[sheet_name],
+                                         help="Sheet selain sheet ini dibaca dari Excel saat pertama kali dipakai.")
+            if st.button('Jalankan analisis Pareto') and kolom_tersedia(laporan, "pareto", "Analisis Pareto"):
+                if set(sheet_total) <= {sheet_name}:
+                    # total customer = customer sheet ini, persentase customer aktif tidak berarti
+                    st.caption("Total customer dihitung dari sheet ini saja. Pilih sheet lain untuk melihat "
+                               "persentase customer yang aktif.")
+                    pareto_analysis (df, periode, None, None, threshold, int(top_n))
+                else:
+                    # Total customer dari sheet yang dipilih: terdaftar jika minimal satu
+                    # transaksinya bertanda "Terdaftar di form" = 1
+                    def hitung_total_customer():
+                        partials, _ = aggregate_store.load_partials(uploaded_file, sheet_total)
+                        return members.customer_totals_by_flag(partials["ID Customer"], partials["Transaksi Terdaftar"] > 0)
+                    with profiler.stage("total_customer"):
+                        totals = memo.section(("total_customer", loader.file_hash(uploaded_file), sheet_name,
+                                               tuple(sorted(sheet_total))), hitung_total_customer)
+                    st.caption(f"Customer di sheet {', '.join(sheet_total)}: {totals['terdaftar']} terdaftar, "
+                               f"{totals['tidak_terdaftar']} tidak terdaftar")
+                    pareto_analysis (df, periode, totals["tidak_terdaftar"], totals["terdaftar"], threshold, int(top_n))
 
 if pilihan == '🔍 Analisis Perilaku Pelanggan' :
     st.subheader("🔍 Analisis Perilaku Pelanggan")
@@ -262,31 +411,51 @@ if pilihan == '🔍 Analisis Perilaku Pelanggan' :
     st.markdown("---")
     
     if uploaded_file_sales and uploaded_file_member :
-        pelanggan_terdaftar_di_form = pd.ExcelFile(uploaded_file_member)
-        sheet_names1 = pelanggan_terdaftar_di_form.sheet_names
+        sheet_names1 = loader.sheet_names(uploaded_file_member)
         st.markdown("**🔴 Pilih Sheet data member:**")
         sheet_name1 = st.selectbox("", sheet_names1, index=0)
-        pelanggan_data = pd.read_excel(pelanggan_terdaftar_di_form, sheet_name=sheet_name1)
+        with profiler.stage("muat_sheet_member") as s:
+            pelanggan_data = loader.load_sheet(uploaded_file_member, sheet_name1)
+            laporan_member = loader.validation_report(uploaded_file_member, sheet_name1)
+            s.rows_out = len(pelanggan_data)
+        tampilkan_validasi(laporan_member, "validasi_member", judul="data member", df=pelanggan_data)
         if uploaded_file_sales :
-            xls = pd.ExcelFile(uploaded_file_sales)
-            sheet_names = xls.sheet_names
+            sheet_names = loader.sheet_names(uploaded_file_sales)
             st.markdown("**🔴 Pilih sheet data penjualan yang ingin diproses:**")
             selected_sheets = st.multiselect("", sheet_names)
             if len(selected_sheets) >= 1:
-                data_frames = {}
-                for sheet in selected_sheets:
-                    data_frames[sheet] = pd.read_excel(xls, sheet_name=sheet)
-                for sheet, df in data_frames.items():
-                    df["Bulan"] = sheet
-                sales_data = pd.concat(data_frames.values(), ignore_index=True)
-        pelanggan_data.rename(columns={"id customer": "ID Customer"}, inplace=True)
-        #untuk memastikan kolom yang dibutuhkan ada
-        required_columns_sales = {"ID Customer", "Terdaftar di form"}
-        required_columns_customers = {"ID Customer"}
+                # Hanya sheet yang belum pernah diringkas yang dibaca dari Excel; bulan lainnya
+                # diambil dari penyimpanan agregat per pelanggan per bulan
+                with profiler.stage("muat_agregat_penjualan") as s:
+                    partials, waktu_muat = memo.section(
+                        ("agregat", loader.file_hash(uploaded_file_sales), tuple(selected_sheets)),
+                        lambda: aggregate_store.load_partials(uploaded_file_sales, selected_sheets))
+                    laporan = memo.section(
+                        ("validasi", loader.file_hash(uploaded_file_sales), tuple(selected_sheets)),
+                        lambda: aggregate_store.load_validation(uploaded_file_sales, selected_sheets))
+                    s.rows_out = len(partials)
+                with st.expander("⏱️ Waktu muat sheet"):
+                    st.dataframe(waktu_muat)
+                tampilkan_validasi(laporan, "validasi_penjualan", judul="data penjualan")
+                # Deret harian setiap sheet disimpan bersama partial-nya, jadi tren gabungan
+                # semua sheet yang dipilih tidak perlu mengelompokkan ulang baris transaksi
+                with st.expander("📈 Tren penjualan sheet yang dipilih"):
+                    with profiler.stage("deret_gabungan") as s:
+                        deret = memo.section(
+                            ("deret_gabungan", loader.file_hash(uploaded_file_sales), tuple(selected_sheets)),
+                            lambda: timeseries.SalesSeries(aggregate_store.load_daily(uploaded_file_sales, selected_sheets)))
+                        s.rows_out = len(deret)
+                    grafik_tren(deret, "tren_gabungan")
+        pelanggan_data = memo.section("normalisasi_member", members.normalize_members, pelanggan_data)
         st.markdown("---")
-        if required_columns_sales.issubset(sales_data.columns) and required_columns_customers.issubset(pelanggan_data.columns):
+        # Kolom yang dibutuhkan diperiksa dari laporan validasi saat data dimuat; kolom_tersedia
+        # sudah menampilkan kolom yang tidak ada, dan tanpa sheet terpilih belum ada yang dianalisis
+        if (selected_sheets and kolom_tersedia(laporan, "frekuensi", "Analisis perilaku pelanggan")
+                and kolom_tersedia(laporan_member, "member", "Analisis perilaku pelanggan")):
             # Analisis transaksi per bulan
-            transactions_per_month = sales_data.groupby(["Bulan", "ID Customer"]).size().reset_index(name="Jumlah Transaksi")
+            with profiler.stage("transaksi_per_bulan", rows_in=len(partials)) as s:
+                transactions_per_month = memo.section("transaksi_per_bulan", frequency.transactions_from_partials, partials)
+                s.rows_out = len(transactions_per_month)
             st.subheader("Kategori Frekuensi Transaksi Pelanggan per Bulan")
             st.write(f'''
                      ditentukan berdasarkan kuartil jumlah transaksi setiap bulan :
@@ -295,66 +464,36 @@ if pilihan == '🔍 Analisis Perilaku Pelanggan' :
                         - Sering : > Q3
                      ''')
             st.markdown('📌 Q1 & Q3 dihitung per bulan, jadi batas setiap kategori bisa beda setiap bulannya.')
-            #Mengkategorikan
-            data_per_pelanggan = []
-            kuartil_list = []
-            for bulan in transactions_per_month['Bulan'].unique(): # .unique() ngambil daftar semua bulan yang muncul, tapi TANPA duplikat
-                df_bulan = transactions_per_month[transactions_per_month['Bulan'] == bulan].copy() # Mengambil semua baris yang bulannya sama dengan bulan
-                # Hitung kuartil untuk kategorisasi
-                q1 = df_bulan['Jumlah Transaksi'].quantile(0.25)
-                q3 = df_bulan['Jumlah Transaksi'].quantile(0.75)
-                kuartil_list.append({'Bulan': bulan, 'Q1': q1, 'Q3': q3})
-                def kategorikan(x):
-                    if x <= q1:
-                        return 'Jarang'
-                    elif x <= q3:
-                        return 'Biasa'
-                    else:
-                        return 'Sering'
-                df_bulan['Kategori'] = df_bulan['Jumlah Transaksi'].apply(kategorikan)
-                # Buat kolom Kategori jadi urutan tetap
-                kategori_order = pd.CategoricalDtype(['Sering', 'Biasa', 'Jarang'], ordered=True)
-                df_bulan['Kategori'] = df_bulan['Kategori'].astype(kategori_order)
-                data_per_pelanggan.append(df_bulan)
-            hasil_kategori_per_pelanggan = pd.concat(data_per_pelanggan, ignore_index=True)
-            hasil_kategori_per_pelanggan = hasil_kategori_per_pelanggan.sort_values(by=['Bulan', 'Kategori'])
-            df_kuartil = pd.DataFrame(kuartil_list)
+            #Mengkategorikan (Q1 & Q3 semua bulan dihitung sekaligus)
+            with profiler.stage("kuartil_frekuensi", rows_in=len(transactions_per_month)) as s:
+                df_kuartil, hasil_kategori_per_pelanggan = memo.section(
+                    "kuartil_frekuensi", frequency.categorize_frequency, transactions_per_month)
+                s.rows_out = len(hasil_kategori_per_pelanggan)
             st.dataframe(df_kuartil)
-            st.dataframe(hasil_kategori_per_pelanggan)
+            tabel_halaman(hasil_kategori_per_pelanggan, "kategori_frekuensi", file_name="kategori_frekuensi")
             # Grafik Bar Chart
             st.markdown("Grafik Jumlah Pelanggan Berdasarkan Kategori Frekuensi Transaksi Tiap Bulan")
             # Hitung jumlah pelanggan per kategori tiap bulan
-            kategori_df = (hasil_kategori_per_pelanggan.groupby(['Bulan', 'Kategori'], observed=True).size()
-                           .unstack(fill_value=0).reindex(columns=['Sering', 'Biasa', 'Jarang'])# urutan kategorinya
-                           )
-            # Plot
-            ax = kategori_df.plot( kind='bar', stacked=True, color=['#4CAF50', '#FFC107', '#F44336'],  # hijau, kuning, merah  
-                                  figsize=(10, 6))
-            # Menambahkan label angka di tengah batang
-            for p in ax.patches:
-                if p.get_height() > 0:ax.annotate(str(int(p.get_height())),
-                                                   (p.get_x() + p.get_width() / 2, p.get_y() + p.get_height() / 2),
-                                                     ha='center', va='center', fontsize=10, color='black')
-            plt.title("Jumlah Pelanggan Berdasarkan Kategori Frekuensi Transaksi Tiap Bulan", fontsize=14, fontweight='bold')
-            plt.xlabel("Bulan")
-            plt.ylabel("Jumlah Pelanggan")
-            plt.legend(title="Kategori")
-            plt.tight_layout()
-            st.pyplot(plt)
+            kategori_df = memo.section("jumlah_kategori", frequency.category_counts, hasil_kategori_per_pelanggan)
+            tampilkan_grafik("frequency", kategori_df)
 
             st.markdown("---")
             # Identifikasi pelanggan terdaftar yang tidak bertransaksi
-            sales_data_registered = sales_data[sales_data["Terdaftar di form"] == 1].copy()
-            total_transactions_registered= sales_data_registered.groupby("ID Customer").size().reset_index(name="Total Transaksi")
-            pelanggan_data["Bertransaksi"] = pelanggan_data["ID Customer"].isin(total_transactions_registered["ID Customer"])
-            no_transactions = pelanggan_data[~pelanggan_data["Bertransaksi"]]
+            with profiler.stage("member_tidak_bertransaksi", rows_in=len(pelanggan_data)) as s:
+                indeks_member = members.member_index(pelanggan_data)  # dibuat sekali per sheet member
+                pelanggan_data, no_transactions = memo.section(
+                    "member_tidak_bertransaksi", members.non_transacting_from_partials, partials, pelanggan_data, indeks_member)
+                totals = memo.section("total_customer", members.customer_totals, partials["ID Customer"], indeks_member)
+                s.rows_out = len(no_transactions)
             st.subheader("Pelanggan Terdaftar yang Tidak Bertransaksi")
-            st.dataframe(no_transactions)
+            tabel_halaman(no_transactions, "member_tidak_bertransaksi", file_name="member_tidak_bertransaksi")
             no_transactions_count = no_transactions['ID Customer'].count()
             st.write(f'Jumlah Pelanggan yang Tidak Bertranaksi = {no_transactions_count}')
-            # Ambil input dan ubah ke integer
-            jumlah_customer_tidak_terdaftar = int(st.text_input("Masukkan jumlah customer tidak terdaftar", "47"))
-            jumlah_customer_terdaftar = int(st.text_input("Masukkan jumlah customer terdaftar", "177"))
+            # Terdaftar = ID di data member, tidak terdaftar = ID yang bertransaksi tetapi bukan member
+            jumlah_customer_tidak_terdaftar = totals["tidak_terdaftar"]
+            jumlah_customer_terdaftar = totals["terdaftar"]
+            st.write(f'Jumlah customer terdaftar : {jumlah_customer_terdaftar}')
+            st.write(f'Jumlah customer tidak terdaftar : {jumlah_customer_tidak_terdaftar}')
             total_pelanggan = jumlah_customer_tidak_terdaftar + jumlah_customer_terdaftar
             st.write(f'Total Pelanggan : {total_pelanggan}')
 
@@ -364,19 +503,8 @@ if pilihan == '🔍 Analisis Perilaku Pelanggan' :
             # memasukkan ke dalam Series atau list
             kategori_counts = pd.Series({'Pelanggann Terdaftar yang Tidak Bertransaksi': no_transactions_count,'Pelanggan yang Bertransaksi (Terdaftar & Tidak Terdaftar)': jumlah_pelanggan_aktif})
             custom_colors = ['#ff6666', '#66b3ff']  # merah, biru
-            plt.figure(figsize=(10, 6))
-            wedges, texts, autotexts = plt.pie(kategori_counts, labels=kategori_counts.index, 
-                                               autopct='%1.1f%%', startangle=140, colors=custom_colors, 
-                                               textprops={'fontsize': 12}, wedgeprops={'edgecolor': 'black'})
-            plt.title("Distribusi Pelanggan Terdaftar yang Tidak Bertransaksi", fontsize=14, fontweight='bold', pad=20)
-            plt.axis('equal')  # u/Menjaga proporsi lingkaran
-            st.pyplot(plt)
-
-
-
-
-        else:
-         st.error("Format tidak sesuai. Pastikan kolom 'ID Customer' dan 'Terdaftar di form' ada di data penjualan, serta 'id customer' di data member.")
+            tampilkan_grafik("pie", kategori_counts, title="Distribusi Pelanggan Terdaftar yang Tidak Bertransaksi",
+                             colors=custom_colors)
 
 if pilihan == '👥 Segmentasi RFM' :
     import datetime as dt
@@ -385,125 +513,88 @@ if pilihan == '👥 Segmentasi RFM' :
     uploaded_file_sales = st.file_uploader("Unggah data penjualan ke sini :", type=["xlsx"])
     uploaded_file_member = st.file_uploader("Unggah data member ke sini :", type=["xlsx"])
     if uploaded_file_sales and uploaded_file_member :
-        pelanggan_terdaftar_di_form = pd.ExcelFile(uploaded_file_member)
-        sheet_names1 = pelanggan_terdaftar_di_form.sheet_names
+        sheet_names1 = loader.sheet_names(uploaded_file_member)
         st.markdown("**🔴 Pilih Sheet data member:**")
         sheet_name1 = st.selectbox("", sheet_names1, index=0)
-        pelanggan_data = pd.read_excel(pelanggan_terdaftar_di_form, sheet_name=sheet_name1)
+        with profiler.stage("muat_sheet_member") as s:
+            pelanggan_data = loader.load_sheet(uploaded_file_member, sheet_name1)
+            laporan_member = loader.validation_report(uploaded_file_member, sheet_name1)
+            s.rows_out = len(pelanggan_data)
+        tampilkan_validasi(laporan_member, "validasi_member", judul="data member", df=pelanggan_data)
         if uploaded_file_sales :
-            xls = pd.ExcelFile(uploaded_file_sales)
-            sheet_names = xls.sheet_names
+            sheet_names = loader.sheet_names(uploaded_file_sales)
             st.markdown("**🔴 Pilih sheet data penjualan yang ingin diproses:**")
             selected_sheets = st.multiselect("", sheet_names)
             if len(selected_sheets) >= 1:
-                data_frames = {}
-                for sheet in selected_sheets:
-                    data_frames[sheet] = pd.read_excel(xls, sheet_name=sheet, parse_dates=['Tanggal'])
-                for sheet, df in data_frames.items():
-                    df["Bulan"] = sheet
-                sales_data = pd.concat(data_frames.values(), ignore_index=True)
-                #untuk memastikan kolom yang dibutuhkan ada
-                required_columns_sales = {"ID Customer", "Terdaftar di form"}
-                required_columns_customers = {"id customer"}
-                if required_columns_sales.issubset(sales_data.columns) and required_columns_customers.issubset(pelanggan_data.columns):
+                # Hanya sheet yang belum pernah diringkas yang dibaca dari Excel
+                with profiler.stage("muat_agregat_penjualan") as s:
+                    partials, waktu_muat = memo.section(
+                        ("agregat", loader.file_hash(uploaded_file_sales), tuple(selected_sheets), "Tanggal"),
+                        lambda: aggregate_store.load_partials(uploaded_file_sales, selected_sheets, parse_dates=['Tanggal']))
+                    laporan = memo.section(
+                        ("validasi", loader.file_hash(uploaded_file_sales), tuple(selected_sheets)),
+                        lambda: aggregate_store.load_validation(uploaded_file_sales, selected_sheets))
+                    s.rows_out = len(partials)
+                with st.expander("⏱️ Waktu muat sheet"):
+                    st.dataframe(waktu_muat)
+                tampilkan_validasi(laporan, "validasi_penjualan", judul="data penjualan")
+                # Kolom yang dibutuhkan (termasuk Nama, Tanggal, dan Reseller) diperiksa dari laporan validasi
+                if kolom_tersedia(laporan, "rfm", "Segmentasi RFM") and kolom_tersedia(laporan_member, "member", "Segmentasi RFM"):
                     snapshot_date = st.date_input("Pilih Tanggal Snapshot", dt.date(2024, 12, 31))
                     snapshot_date = dt.datetime.combine(snapshot_date, dt.datetime.min.time())
-                    rfm = sales_data.groupby('ID Customer').agg({
-                        'Nama': 'first',
-                        'Tanggal': lambda x: (snapshot_date - x.max()).days,  # Recency
-                        'ID Customer': 'count',  # Frequency
-                        'Total Penjualan': 'sum',  # Monetary
-                        'Terdaftar di form': 'first',
-                        'Reseller': 'first'})
-                    rfm.rename(columns={
-                        'Tanggal': 'Recency',
-                        'ID Customer': 'Frequency',
-                        'Total Penjualan': 'Monetary'}, inplace=True)
-                    def get_rfm_score(recency, frequency, monetary):
-                        r_score = 3 if recency <= 30 else 2 if 31 <= recency <= 59 else 1
-                        f_score = 4 if frequency >= 12 else 3 if 6 <= frequency <= 12 else 2 if 3 <= frequency <= 5 else 1
-                        m_score = 4 if monetary > 500000 else 3 if 300000 <= monetary <= 500000 else 2 if 100000 <= monetary <= 299000 else 1
-                        return r_score, f_score, m_score
-                    rfm[['R', 'F', 'M']] = rfm.apply(lambda row: pd.Series(get_rfm_score(row['Recency'], row['Frequency'], row['Monetary'])), axis=1)
-                    # Fungsi untuk Kategorisasi
-                    def categorize_customer(r, f, m):
-                        if r == 3 and f == 4 and m == 4:
-                            return "Best Customers"
-                        elif r == 3 and (f in [3, 4]) and (m in [3, 4]):
-                            return "Loyal Customers"
-                        elif r == 3 and (f in [3, 4]) and (m in [1, 2]):
-                            return "Budget Buyers"
-                        elif r in [1, 2] and f in [1, 2] and m in [2, 3]:
-                            return "Churn Risk"
-                        elif r == 1 and f == 1 and m == 1:
-                            return "Lost Customers"
-                        elif r in [1, 2, 3] and f in [1, 2] and m == 4:
-                            return "Big Spenders"
-                        elif r == 3 and f in [1, 2] and m in [2, 3, 4]:
-                            return "Potential Customers"
-                        else:
-                            return "OTHER"
-                    rfm["Kategori"] = rfm.apply(lambda row: categorize_customer(row["R"], row["F"], row["M"]), axis=1)
+                    # Recency/Frequency/Monetary, skor, dan kategori dihitung tervektorisasi
+                    with profiler.stage("rfm", rows_in=len(partials)) as s:
+                        rfm = memo.section("rfm", rfm_module.rfm_from_partials, partials, snapshot_date)
+                        s.rows_out = len(rfm)
                     st.subheader("Hasil RFM Analysis")
-                    categories = {
-                        "Best Customers": rfm[rfm["Kategori"] == "Best Customers"],
-                        "Loyal Customers": rfm[rfm["Kategori"] == "Loyal Customers"],
-                        "Budget Buyers": rfm[rfm["Kategori"] == "Budget Buyers"],
-                        "Churn Risk": rfm[rfm["Kategori"] == "Churn Risk"],
-                        "Lost Customers": rfm[rfm["Kategori"] == "Lost Customers"],
-                        "Big Spenders": rfm[rfm["Kategori"] == "Big Spenders"],
-                        "Potential Customers": rfm[rfm["Kategori"] == "Potential Customers"],
-                        "OTHER": rfm[rfm["Kategori"] == "OTHER"]}
+                    categories = memo.section("segmen_rfm", per_kategori, rfm)
                     # Menampilkan jumlah pelanggan dalam setiap kategori
                     st.subheader("• Jumlah pelanggan dalam setiap kategori :")
                     kategori_counts = rfm["Kategori"].value_counts()
+                    kategori_counts = kategori_counts[kategori_counts > 0]
                     st.write(kategori_counts)
                     st.markdown("---")
 
-                    plt.figure(figsize=(10, 6))
-                    colors = plt.cm.Set3.colors  # Warna pastel
-                    wedges, texts, autotexts = plt.pie( kategori_counts, labels=kategori_counts.index, autopct='%1.1f%%',
-                                                        startangle=140, colors=colors, textprops={'fontsize': 12}, wedgeprops={'edgecolor': 'black'})
-                    plt.title("Distribusi Pelanggan Berdasarkan Kategori RFM", fontsize=14, fontweight='bold', pad=20)
-                    plt.axis('equal')  # Menjaga proporsi lingkaran
-                    st.pyplot(plt)
+                    tampilkan_grafik("pie", kategori_counts, title="Distribusi Pelanggan Berdasarkan Kategori RFM")
                     st.markdown("---")
 
                     # Menampilkan DataFrame masing-masing kategori
                     for category, data in categories.items():
                         st.subheader(f"{category}")
-                        st.dataframe(data)
-                    
-            
-                    
-            
-            
+                        tabel_halaman(data, f"rfm_{category}", file_name=f"rfm_{category}")
 
-    
-    
-    
-            
-    
-            
-    
-    
-
-        
-    
-    
-
-
-        
-        
-        
-
-
-  
 
-
-
-        
-            
-
-
-    
+# Panel performa: tabel per tahap dan ekspor log terstruktur (JSON Lines)
+if profiler.is_enabled():
+    with st.sidebar.expander("⏱️ Performa", expanded=True):
+        catatan = profiler.to_frame()
+        if catatan.empty:
+            st.caption("Belum ada tahap analisis yang dijalankan.")
+        else:
+            st.dataframe(catatan.assign(peak_MB=(catatan["peak_bytes"] / 1024**2).round(2))
+                         .drop(columns=["peak_bytes", "net_bytes"]), hide_index=True)
+            st.caption(f"Total: {catatan.loc[catatan['depth'] == 0, 'wall_s'].sum():.3f} detik")
+            st.download_button("Unduh log (JSONL)", profiler.to_jsonl(halaman=pilihan),
+                               file_name="performa.jsonl", mime="application/json")
+        memo_info = memo.cache_info()
+        st.caption(f"Memo bagian halaman: {memo_info['entries']} hasil, {memo_info['hit']} hit, {memo_info['miss']} miss")
+        cache_bersama = shared_cache.cache_info()
+        st.caption(f"Cache bersama: {cache_bersama['bytes'] / 1024**2:,.1f} dari {cache_bersama['max_bytes'] / 1024**2:,.0f} MB, "
+                   f"{cache_bersama['entries']} entri ({cache_bersama['pinned']} sedang dipakai), "
+                   f"{cache_bersama['sessions']} sesi aktif")
+        cache_disk = disk_cache.cache_info()
+        if cache_disk["enabled"]:
+            st.caption(f"Cache disk (Feather): {cache_disk['entries']} file, {cache_disk['bytes'] / 1024**2:,.1f} dari "
+                       f"{cache_disk['max_bytes'] / 1024**2:,.0f} MB")
+        else:
+            st.caption("Cache disk tidak aktif (pyarrow tidak terpasang).")
+        cache_grafik = charts.cache_info()
+        st.caption(f"Cache gambar grafik: {cache_grafik['entries']} gambar, {cache_grafik['bytes'] / 1024**2:,.1f} dari "
+                   f"{cache_grafik['max_bytes'] / 1024**2:,.0f} MB")
+        agregat = aggregate_store.info()
+        st.caption(f"Penyimpanan agregat: {agregat['bulan']} sheet, {agregat['baris_partial']:,} baris partial, "
+                   f"{agregat['bytes'] / 1024**2:,.1f} MB")
+        tabel_cache = shared_cache.to_frame()
+        st.dataframe(tabel_cache.assign(MB=(tabel_cache["bytes"] / 1024**2).round(2)).drop(columns="bytes"),
+                     hide_index=True)
+        st.caption("Memori diukur dengan tracemalloc (hanya aktif saat panel ini ditampilkan).")